@@ -3,27 +3,44 @@
 
 import os
 import datetime
+import email.utils
 import re
 import io
 import json
 import time
+import queue
+import random
+import asyncio
+import atexit
+import functools
+import hashlib
+import sqlite3
+import unicodedata
+import threading
 import traceback
 import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import defaultdict
-from urllib.parse import quote_plus, urlencode
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from urllib.parse import quote_plus, urlencode, urlparse
 
 # Framework e APIs
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import bibtexparser
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # Google APIs
 import google.generativeai as genai
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from google.auth.exceptions import RefreshError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -41,6 +58,7 @@ GOOGLE_TOKEN_JSON = os.environ.get('GOOGLE_TOKEN_JSON')
 # APIs de Fontes Acadêmicas
 WOS_API_KEY = os.environ.get('WOS_API_KEY')
 CORE_API_KEY = os.environ.get('CORE_API_KEY')
+NCBI_API_KEY = os.environ.get('NCBI_API_KEY')
 OPENALEX_EMAIL = os.environ.get('OPENALEX_EMAIL', 'seu.email@dominio.com')
 
 # Configurações fixas
@@ -50,6 +68,12 @@ CROSSREF_MAILTO = "seu.email@dominio.com"
 SCOPES = ['https://www.googleapis.com/auth/drive']
 TOKEN_FILE = 'token.json'
 
+# Paralelismo das buscas (também define o tamanho dos pools HTTP por host)
+SEARCH_MAX_WORKERS = int(os.environ.get('SEARCH_MAX_WORKERS', 16))
+
+# Motor de busca: 'threads' (requests) ou 'async' (httpx em um único event loop)
+SEARCH_ENGINE = os.environ.get('SEARCH_ENGINE', 'threads').lower()
+
 # --- LOGGING E DEBUG ---
 def log_error(error_msg, exception=None):
     print(f"[ERRO] {error_msg}")
@@ -63,6 +87,7 @@ def log_info(msg):
 # --- VALIDAÇÃO DE CONFIGURAÇÃO ---
 def validate_config():
     """Valida se as configurações necessárias estão presentes"""
+    global SEARCH_ENGINE
     missing_configs = []
     
     if not GEMINI_API_KEY:
@@ -75,6 +100,10 @@ def validate_config():
         log_error(f"Configurações obrigatórias ausentes: {', '.join(missing_configs)}")
         log_info("Configure as variáveis de ambiente no Render")
     
+    if SEARCH_ENGINE == 'async' and httpx is None:
+        log_error("SEARCH_ENGINE=async requer o pacote httpx; usando 'threads'")
+        SEARCH_ENGINE = 'threads'
+    
     # Log de APIs opcionais
     optional_apis = {
         'Web of Science': WOS_API_KEY,
@@ -85,23 +114,900 @@ def validate_config():
         status = "✅ Configurada" if api_key else "⚠️ Não configurada (opcional)"
         log_info(f"{api_name}: {status}")
 
+# --- POOL DE CONEXÕES HTTP ---
+
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+def get_http_session(host):
+    """Retorna a sessão HTTP (keep-alive) compartilhada para um host"""
+    session = _http_sessions.get(host)
+    if session is not None:
+        return session
+
+    with _http_sessions_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=SEARCH_MAX_WORKERS,
+                pool_block=False
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_sessions[host] = session
+            log_info(f"Pool HTTP criado para {host} (maxsize={SEARCH_MAX_WORKERS})")
+        return session
+
+def http_get(url, rate_limit=True, **kwargs):
+    """GET usando o pool de conexões do host de destino.
+
+    Respeita o limite de taxa do host (rate_limit=False quando quem chama já
+    reservou o token). Um 429 é devolvido a quem chamou (ver fetch_with_retry).
+    """
+    host = urlparse(url).netloc
+    if rate_limit:
+        wait_for_rate_limit(host)
+    return get_http_session(host).get(url, **kwargs)
+
+def get_http_pool_stats():
+    """Contadores de conexões abertas e reutilizadas por host"""
+    stats = {}
+    with _http_sessions_lock:
+        sessions = list(_http_sessions.items())
+
+    for host, session in sessions:
+        connections = 0
+        requests_count = 0
+        adapters = {id(a): a for a in session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections += pool.num_connections
+                requests_count += pool.num_requests
+        stats[host] = {
+            'connections_opened': connections,
+            'requests': requests_count,
+            'connections_reused': max(0, requests_count - connections)
+        }
+    return stats
+
+# --- LIMITE DE TAXA POR HOST ---
+# Um token bucket por host (ou serviço, como o Gemini), compartilhado por todas
+# as threads e pelo event loop. Cada chamada reserva um token e espera só o
+# necessário até ele ficar disponível, então as chamadas entram numa fila em
+# vez de falhar com 429. Quem tem prazo passa `max_wait`: se a fila passaria
+# dele, a chamada falha na hora sem gastar o token.
+
+# Requisições por segundo; pode ser sobrescrito com RATE_LIMIT_<HOST>
+# (ex.: RATE_LIMIT_API_CROSSREF_ORG=20)
+HOST_RATE_LIMITS = {
+    'eutils.ncbi.nlm.nih.gov': 10 if NCBI_API_KEY else 3,
+    'api.semanticscholar.org': 1,
+    'api.crossref.org': 10,
+    'api.openalex.org': 10,
+    'export.arxiv.org': 1 / 3,
+    'doaj.org': 2,
+    'api.core.ac.uk': 10 / 60,
+    'api.clarivate.com': 2,
+    'wos-api.clarivate.com': 2,
+    'gemini': 15 / 60
+}
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', 1))
+
+class RateLimitWaitError(requests.exceptions.Timeout):
+    """A espera pelo token do limitador passaria do prazo da chamada"""
+
+class TokenBucket:
+    """Token bucket com reservas: quem chega depois espera atrás de quem chegou antes"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttles = 0
+        self.rejections = 0
+    
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self, max_wait=None):
+        """Reserva um token e devolve quantos segundos esperar antes de usá-lo.
+
+        Devolve None (sem reservar) se a espera passaria de `max_wait`.
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+            if max_wait is not None and delay > max_wait:
+                self.rejections += 1
+                return None
+            self.tokens -= 1
+            if delay:
+                self.waits += 1
+                self.wait_seconds += delay
+            return delay
+    
+    def throttle(self, seconds=None):
+        """Esvazia o bucket após um 429, adiando as próximas chamadas"""
+        with self.lock:
+            self._refill(time.monotonic())
+            seconds = seconds if seconds is not None else 1 / self.rate
+            self.tokens = min(self.tokens, -seconds * self.rate)
+            self.throttles += 1
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_host_rate_limit(host):
+    env_value = os.environ.get('RATE_LIMIT_' + re.sub(r'[^A-Za-z0-9]', '_', host).upper())
+    if env_value:
+        return float(env_value)
+    return HOST_RATE_LIMITS.get(host)
+
+def get_rate_limiter(host):
+    """Token bucket do host, ou None se o host não tem limite configurado"""
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            rate = get_host_rate_limit(host)
+            _rate_limiters[host] = TokenBucket(rate, max(1.0, RATE_LIMIT_BURST)) if rate else None
+        return _rate_limiters[host]
+
+def _reserve_rate_limit(host, max_wait):
+    limiter = get_rate_limiter(host)
+    if limiter is None:
+        return 0
+    delay = limiter.reserve(max_wait)
+    if delay is None:
+        raise RateLimitWaitError(f"Fila do limite de taxa de {host} passa do prazo ({max_wait:.1f}s)")
+    return delay
+
+def wait_for_rate_limit(host, max_wait=None):
+    delay = _reserve_rate_limit(host, max_wait)
+    if delay:
+        time.sleep(delay)
+
+async def async_wait_for_rate_limit(host, max_wait=None):
+    delay = _reserve_rate_limit(host, max_wait)
+    if delay:
+        await asyncio.sleep(delay)
+
+def throttle_rate_limit(host, seconds=None):
+    """Registra um 429 e adia as próximas chamadas ao host (se ele tem bucket)"""
+    log_error(f"Rate limit excedido em {host}")
+    limiter = get_rate_limiter(host)
+    if limiter is not None:
+        limiter.throttle(seconds)
+
+def parse_retry_after(response):
+    """Segundos indicados no cabeçalho Retry-After (número ou data HTTP)"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def get_rate_limit_stats():
+    with _rate_limiters_lock:
+        limiters = {host: limiter for host, limiter in _rate_limiters.items() if limiter is not None}
+    return {
+        host: {
+            'rate_per_second': round(limiter.rate, 3),
+            'waits': limiter.waits,
+            'wait_seconds': round(limiter.wait_seconds, 2),
+            'throttles': limiter.throttles,
+            'rejections': limiter.rejections
+        }
+        for host, limiter in limiters.items()
+    }
+
+# --- CIRCUIT BREAKER POR FONTE ---
+# Cada fonte tem um disjuntor alimentado pelas chamadas HTTP dos conectores.
+# Falhas (exceções, 429, 5xx) e chamadas lentas numa janela recente abrem o
+# circuito: a fonte é pulada até CIRCUIT_OPEN_SECONDS depois, quando uma única
+# busca de teste (meio-aberto) decide se ele fecha ou abre de novo.
+
+CIRCUIT_WINDOW_CALLS = int(os.environ.get('CIRCUIT_WINDOW_CALLS', 20))
+CIRCUIT_WINDOW_SECONDS = float(os.environ.get('CIRCUIT_WINDOW_SECONDS', 300))
+CIRCUIT_MIN_CALLS = int(os.environ.get('CIRCUIT_MIN_CALLS', 5))
+CIRCUIT_FAILURE_RATIO = float(os.environ.get('CIRCUIT_FAILURE_RATIO', 0.5))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get('CIRCUIT_SLOW_CALL_SECONDS', 15))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', 60))
+
+class CircuitOpenError(Exception):
+    """A fonte está com o circuito aberto e não deve ser consultada agora"""
+
+class CircuitBreaker:
+    """Disjuntor fechado/aberto/meio-aberto de uma fonte"""
+    
+    def __init__(self, source):
+        self.source = source
+        self.state = 'closed'
+        self.calls = deque(maxlen=CIRCUIT_WINDOW_CALLS)
+        self.opened_at = None
+        self.probe_started = None
+        self.times_opened = 0
+        self.lock = threading.Lock()
+    
+    def _advance(self, now):
+        if self.state == 'open' and now - self.opened_at >= CIRCUIT_OPEN_SECONDS:
+            self.state = 'half_open'
+            self.probe_started = None
+        while self.calls and self.calls[0][0] < now - CIRCUIT_WINDOW_SECONDS:
+            self.calls.popleft()
+    
+    def _open(self, now):
+        self.state = 'open'
+        self.opened_at = now
+        self.probe_started = None
+        self.times_opened += 1
+        log_error(f"Circuito de {self.source} aberto por {CIRCUIT_OPEN_SECONDS:.0f}s")
+    
+    def allow_search(self):
+        """Se uma nova busca na fonte pode começar (no meio-aberto, só uma de teste)"""
+        with self.lock:
+            now = time.monotonic()
+            self._advance(now)
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                return False
+            if self.probe_started is None or now - self.probe_started > CIRCUIT_OPEN_SECONDS:
+                self.probe_started = now
+                log_info(f"Circuito de {self.source} meio-aberto: busca de teste liberada")
+                return True
+            return False
+    
+    def allow_call(self):
+        """Se uma chamada HTTP de uma busca já em andamento pode sair"""
+        with self.lock:
+            self._advance(time.monotonic())
+            return self.state != 'open'
+    
+    def record(self, ok, latency):
+        failure = not ok or latency > CIRCUIT_SLOW_CALL_SECONDS
+        with self.lock:
+            now = time.monotonic()
+            self._advance(now)
+            if self.state == 'half_open':
+                if failure:
+                    self._open(now)
+                else:
+                    self.state = 'closed'
+                    self.calls.clear()
+                    self.probe_started = None
+                    log_info(f"Circuito de {self.source} fechado")
+                return
+            
+            self.calls.append((now, failure, latency))
+            failures = sum(1 for _, failed, _ in self.calls if failed)
+            if (self.state == 'closed' and len(self.calls) >= CIRCUIT_MIN_CALLS
+                    and failures / len(self.calls) >= CIRCUIT_FAILURE_RATIO):
+                self._open(now)
+    
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic()
+            self._advance(now)
+            calls = len(self.calls)
+            failures = sum(1 for _, failed, _ in self.calls if failed)
+            latencies = [latency for _, _, latency in self.calls]
+            return {
+                'state': self.state,
+                'recent_calls': calls,
+                'failure_rate': round(failures / calls, 3) if calls else 0.0,
+                'avg_latency': round(sum(latencies) / calls, 3) if calls else None,
+                'retry_in': round(max(0.0, self.opened_at + CIRCUIT_OPEN_SECONDS - now), 1) if self.state == 'open' else None,
+                'times_opened': self.times_opened
+            }
+
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(source):
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(source)
+        if breaker is None:
+            breaker = _circuit_breakers[source] = CircuitBreaker(source)
+        return breaker
+
+# --- LATÊNCIA POR FONTE E REQUISIÇÕES HEDGED ---
+# Cada requisição HTTP de um conector alimenta o histograma de latência da
+# fonte (e o tamanho dos corpos JSON recebidos). Nas fontes com hedging, se a
+# resposta demora mais que o p90 observado, uma cópia da requisição é
+# disparada e vale a que chegar primeiro.
+# As cópias ficam limitadas a HEDGE_MAX_RATIO das chamadas da fonte.
+
+HEDGED_SOURCES = set(filter(None, os.environ.get('HEDGED_SOURCES', 'semantic_scholar,crossref').split(',')))
+HEDGE_QUANTILE = float(os.environ.get('HEDGE_QUANTILE', 0.9))
+HEDGE_MAX_RATIO = float(os.environ.get('HEDGE_MAX_RATIO', 0.1))
+HEDGE_MIN_SAMPLES = int(os.environ.get('HEDGE_MIN_SAMPLES', 20))
+LATENCY_BUCKETS = [0.05 * 1.25 ** i for i in range(36)]
+LATENCY_DECAY_TOTAL = 1000
+
+class LatencyHistogram:
+    """Histograma com buckets exponenciais; as contagens decaem para seguir mudanças recentes"""
+    
+    def __init__(self):
+        self.counts = [0.0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.samples = 0
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.payload_bytes = 0
+        self.payloads = 0
+        self.lock = threading.Lock()
+    
+    def record(self, seconds):
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self.lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.samples += 1
+            if self.total >= LATENCY_DECAY_TOTAL:
+                self.counts = [count / 2 for count in self.counts]
+                self.total /= 2
+    
+    def quantile(self, q):
+        """Limite superior do bucket que contém o quantil q (None sem amostras)"""
+        with self.lock:
+            if not self.total:
+                return None
+            target = q * self.total
+            cumulative = 0.0
+            for index, count in enumerate(self.counts):
+                cumulative += count
+                if cumulative >= target:
+                    return LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)]
+        return LATENCY_BUCKETS[-1]
+    
+    def hedge_delay(self):
+        """Espera antes da cópia, ou None se não há dados suficientes ou a cota acabou"""
+        with self.lock:
+            self.calls += 1
+            if self.samples < HEDGE_MIN_SAMPLES or self.hedges + 1 > self.calls * HEDGE_MAX_RATIO:
+                return None
+        return self.quantile(HEDGE_QUANTILE)
+    
+    def record_hedge(self, won):
+        with self.lock:
+            self.hedges += 1
+            self.hedge_wins += int(won)
+    
+    def record_payload(self, size):
+        with self.lock:
+            self.payload_bytes += size
+            self.payloads += 1
+    
+    def snapshot(self):
+        return {
+            'samples': self.samples,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'calls': self.calls,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'avg_payload_kb': round(self.payload_bytes / self.payloads / 1024, 1) if self.payloads else None
+        }
+
+_latency_histograms = defaultdict(LatencyHistogram)
+_latency_histograms_lock = threading.Lock()
+_hedge_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix='hedge')
+
+def get_latency_histogram(source):
+    with _latency_histograms_lock:
+        return _latency_histograms[source]
+
+def get_latency_stats():
+    with _latency_histograms_lock:
+        histograms = dict(_latency_histograms)
+    return {source: histogram.snapshot() for source, histogram in histograms.items()}
+
+# O token do limitador é reservado antes de começar a medir: o histograma só
+# vê o tempo de rede, não a fila do limite de taxa. A chamada principal já
+# chega com o token (fetch_with_retry); a cópia do hedge reserva o seu aqui,
+# sem esperar mais que o próprio timeout.
+def _timed_http_get(histogram, url, kwargs, reserve_token=False):
+    if reserve_token:
+        wait_for_rate_limit(urlparse(url).netloc, kwargs.get('timeout'))
+    started = time.monotonic()
+    response = http_get(url, rate_limit=False, **kwargs)
+    histogram.record(time.monotonic() - started)
+    if not kwargs.get('stream'):
+        histogram.record_payload(len(response.content))
+    return response
+
+async def _timed_async_http_get(histogram, url, kwargs, reserve_token=False):
+    if reserve_token:
+        await async_wait_for_rate_limit(urlparse(url).netloc, kwargs.get('timeout'))
+    started = time.monotonic()
+    response = await async_http_get(url, rate_limit=False, **kwargs)
+    histogram.record(time.monotonic() - started)
+    if not kwargs.get('stream'):
+        histogram.record_payload(len(response.content))
+    return response
+
+def _discard_response(future):
+    # Fecha a resposta perdedora para devolver a conexão ao pool
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+def hedged_http_get(source, url, kwargs):
+    """GET que dispara uma cópia se passar do p90 da fonte (motor de threads)"""
+    histogram = get_latency_histogram(source)
+    delay = histogram.hedge_delay() if source in HEDGED_SOURCES else None
+    if delay is None:
+        return _timed_http_get(histogram, url, kwargs)
+    
+    primary = _hedge_executor.submit(_timed_http_get, histogram, url, kwargs)
+    try:
+        return primary.result(timeout=delay)
+    except FuturesTimeoutError:
+        pass
+    
+    log_info(f"{source}: resposta acima do p{int(HEDGE_QUANTILE * 100)} ({delay:.2f}s); disparando cópia")
+    hedge = _hedge_executor.submit(_timed_http_get, histogram, url, kwargs, True)
+    pending = {primary, hedge}
+    first_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                histogram.record_hedge(future is hedge)
+                (hedge if future is primary else primary).add_done_callback(_discard_response)
+                return future.result()
+            first_error = first_error or future.exception()
+    histogram.record_hedge(False)
+    raise first_error
+
+async def async_hedged_http_get(source, url, kwargs):
+    """GET que dispara uma cópia se passar do p90 da fonte (motor assíncrono)"""
+    histogram = get_latency_histogram(source)
+    delay = histogram.hedge_delay() if source in HEDGED_SOURCES else None
+    if delay is None:
+        return await _timed_async_http_get(histogram, url, kwargs)
+    
+    primary = asyncio.ensure_future(_timed_async_http_get(histogram, url, kwargs))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+    
+    log_info(f"{source}: resposta acima do p{int(HEDGE_QUANTILE * 100)} ({delay:.2f}s); disparando cópia")
+    hedge = asyncio.ensure_future(_timed_async_http_get(histogram, url, kwargs, True))
+    pending = {primary, hedge}
+    first_error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    histogram.record_hedge(task is hedge)
+                    return task.result()
+                first_error = first_error or task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+    histogram.record_hedge(False)
+    raise first_error
+
+# --- MOTOR DE EXECUÇÃO DOS CONECTORES ---
+# Cada conector é um gerador que produz chamadas HTTP (http_call) e recebe a
+# resposta de volta. O mesmo código de parsing roda no motor de threads
+# (requests) ou no motor assíncrono (httpx), conforme SEARCH_ENGINE.
+
+HttpCall = namedtuple('HttpCall', ['url', 'kwargs'])
+ParallelCalls = namedtuple('ParallelCalls', ['calls'])
+
+def http_call(url, **kwargs):
+    return HttpCall(url, kwargs)
+
+def parallel_calls(calls):
+    """Várias chamadas simultâneas; o conector recebe a lista de respostas na
+    mesma ordem, com a exceção no lugar de cada chamada que falhou"""
+    return ParallelCalls(list(calls))
+
+# Política de novas tentativas: falhas transitórias (timeouts, conexão, 429 e
+# 5xx) são repetidas com backoff exponencial com jitter, respeitando
+# Retry-After, dentro de um prazo total por busca.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_MAX_ATTEMPTS = int(os.environ.get('RETRY_MAX_ATTEMPTS', 3))
+RETRY_BASE_DELAY = float(os.environ.get('RETRY_BASE_DELAY', 0.5))
+RETRY_MAX_DELAY = float(os.environ.get('RETRY_MAX_DELAY', 8))
+SEARCH_RETRY_DEADLINE = float(os.environ.get('SEARCH_RETRY_DEADLINE', 45))
+
+_retry_stats = defaultdict(lambda: defaultdict(int))
+_retry_stats_lock = threading.Lock()
+
+def record_retry_event(source, event):
+    with _retry_stats_lock:
+        _retry_stats[source][event] += 1
+
+def get_retry_stats():
+    with _retry_stats_lock:
+        return {source: dict(events) for source, events in _retry_stats.items()}
+
+class RetryBudget:
+    """Tentativas e prazo total de uma execução de conector"""
+    
+    def __init__(self, source, deadline=None):
+        self.source = source
+        self.deadline = time.monotonic() + (SEARCH_RETRY_DEADLINE if deadline is None else deadline)
+        self.failure = None
+    
+    def remaining(self):
+        return self.deadline - time.monotonic()
+    
+    def clamp_timeout(self, kwargs):
+        """Limita o timeout da chamada ao que resta do prazo"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            record_retry_event(self.source, 'deadline_exceeded')
+            raise requests.exceptions.Timeout(f"Prazo da busca em {self.source} esgotado")
+        timeout = kwargs.get('timeout')
+        if timeout is None or timeout > remaining:
+            kwargs = dict(kwargs, timeout=remaining)
+        return kwargs
+    
+    def next_delay(self, attempt, reason, retry_after=None):
+        """Espera antes da próxima tentativa, ou None se não vale tentar de novo"""
+        if attempt + 1 >= RETRY_MAX_ATTEMPTS:
+            record_retry_event(self.source, 'gave_up')
+            return None
+        delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if delay >= self.remaining():
+            record_retry_event(self.source, 'gave_up')
+            return None
+        record_retry_event(self.source, 'retries')
+        record_retry_event(self.source, f'retry_{reason}')
+        log_info(f"{self.source}: nova tentativa em {delay:.1f}s ({reason})")
+        return delay
+
+def _retry_decision(budget, attempt, response=None, error=None):
+    """Decide se uma resposta ou exceção merece nova tentativa"""
+    if error is not None:
+        if not isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return None
+        return budget.next_delay(attempt, type(error).__name__.lower())
+    if response.status_code not in RETRY_STATUS_CODES:
+        if attempt:
+            record_retry_event(budget.source, 'recovered')
+        return None
+    return budget.next_delay(attempt, str(response.status_code), parse_retry_after(response))
+
+def fetch_with_retry(call, budget):
+    """Executa uma HttpCall com novas tentativas (motor de threads)"""
+    breaker = get_circuit_breaker(budget.source)
+    host = urlparse(call.url).netloc
+    attempt = 0
+    while True:
+        if not breaker.allow_call():
+            budget.failure = 'circuit_open'
+            raise CircuitOpenError(f"Circuito de {budget.source} aberto")
+        # O token é reservado antes de medir: fila no limitador não é lentidão da fonte
+        try:
+            wait_for_rate_limit(host, budget.remaining())
+        except RateLimitWaitError:
+            record_retry_event(budget.source, 'deadline_exceeded')
+            budget.failure = 'timeout'
+            raise
+        started = time.monotonic()
+        try:
+            response = hedged_http_get(budget.source, call.url, budget.clamp_timeout(call.kwargs))
+        except Exception as e:
+            breaker.record(False, time.monotonic() - started)
+            delay = _retry_decision(budget, attempt, error=e)
+            if delay is None:
+                budget.failure = 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'error'
+                raise
+        else:
+            ok = response.status_code < 500 and response.status_code != 429
+            breaker.record(ok, time.monotonic() - started)
+            if response.status_code == 429:
+                throttle_rate_limit(host, parse_retry_after(response))
+            delay = _retry_decision(budget, attempt, response=response)
+            if delay is None:
+                if not ok:
+                    budget.failure = 'error'
+                return response
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+async def async_fetch_with_retry(call, budget):
+    """Executa uma HttpCall com novas tentativas (motor assíncrono)"""
+    breaker = get_circuit_breaker(budget.source)
+    host = urlparse(call.url).netloc
+    attempt = 0
+    while True:
+        if not breaker.allow_call():
+            budget.failure = 'circuit_open'
+            raise CircuitOpenError(f"Circuito de {budget.source} aberto")
+        # O token é reservado antes de medir: fila no limitador não é lentidão da fonte
+        try:
+            await async_wait_for_rate_limit(host, budget.remaining())
+        except RateLimitWaitError:
+            record_retry_event(budget.source, 'deadline_exceeded')
+            budget.failure = 'timeout'
+            raise
+        started = time.monotonic()
+        try:
+            response = await async_hedged_http_get(budget.source, call.url, budget.clamp_timeout(call.kwargs))
+        except Exception as e:
+            breaker.record(False, time.monotonic() - started)
+            delay = _retry_decision(budget, attempt, error=e)
+            if delay is None:
+                budget.failure = 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'error'
+                raise
+        else:
+            ok = response.status_code < 500 and response.status_code != 429
+            breaker.record(ok, time.monotonic() - started)
+            if response.status_code == 429:
+                throttle_rate_limit(host, parse_retry_after(response))
+            delay = _retry_decision(budget, attempt, response=response)
+            if delay is None:
+                if not ok:
+                    budget.failure = 'error'
+                return response
+            response.close()
+        await asyncio.sleep(delay)
+        attempt += 1
+
+_parallel_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix='paralelo')
+
+def fetch_parallel(calls, budget):
+    futures = [_parallel_executor.submit(fetch_with_retry, call, budget) for call in calls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+async def async_fetch_parallel(calls, budget):
+    return await asyncio.gather(*(async_fetch_with_retry(call, budget) for call in calls), return_exceptions=True)
+
+def run_flow_sync(flow, budget):
+    """Executa um conector usando requests (bloqueante)"""
+    try:
+        step = next(flow)
+        while True:
+            try:
+                if isinstance(step, ParallelCalls):
+                    result = fetch_parallel(step.calls, budget)
+                else:
+                    result = fetch_with_retry(step, budget)
+            except Exception as e:
+                step = flow.throw(e)
+                continue
+            step = flow.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+async def run_flow_async(flow, budget):
+    """Executa um conector no event loop usando httpx"""
+    try:
+        step = next(flow)
+        while True:
+            try:
+                if isinstance(step, ParallelCalls):
+                    result = await async_fetch_parallel(step.calls, budget)
+                else:
+                    result = await async_fetch_with_retry(step, budget)
+            except Exception as e:
+                step = flow.throw(e)
+                continue
+            step = flow.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+def connector(flow_function):
+    """Transforma um gerador de chamadas HTTP em função de busca síncrona.
+
+    A versão assíncrona fica disponível em `.run_async` e o gerador em `.flow`.
+    O argumento opcional `budget` (RetryBudget) define o prazo e o nome usado
+    nas métricas de novas tentativas.
+    """
+    @functools.wraps(flow_function)
+    def run(*args, budget=None, **kwargs):
+        budget = budget or RetryBudget(flow_function.__name__)
+        return run_flow_sync(flow_function(*args, **kwargs), budget)
+
+    async def run_async(*args, budget=None, **kwargs):
+        budget = budget or RetryBudget(flow_function.__name__)
+        return await run_flow_async(flow_function(*args, **kwargs), budget)
+
+    run.run_async = run_async
+    run.flow = flow_function
+    return run
+
+_async_loop = None
+_async_client = None
+_async_loop_lock = threading.Lock()
+
+def get_async_loop():
+    """Event loop único do processo, executado em uma thread dedicada"""
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='busca-async', daemon=True).start()
+            _async_loop = loop
+            log_info("Event loop assíncrono de busca iniciado")
+    return _async_loop
+
+def _get_async_client():
+    # Só é chamado de dentro do event loop, então não precisa de lock
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=SEARCH_MAX_WORKERS * 4,
+                max_keepalive_connections=SEARCH_MAX_WORKERS
+            ),
+            follow_redirects=True
+        )
+    return _async_client
+
+async def async_http_get(url, params=None, headers=None, timeout=None, stream=False, rate_limit=True):
+    """GET assíncrono devolvendo um requests.Response equivalente.
+
+    O corpo é sempre lido inteiro; `stream` é aceito só para manter a mesma
+    assinatura de http_get.
+    """
+    if rate_limit:
+        await async_wait_for_rate_limit(urlparse(url).netloc)
+    try:
+        response = await _get_async_client().get(url, params=params, headers=headers, timeout=timeout)
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e))
+    except httpx.HTTPError as e:
+        raise requests.exceptions.ConnectionError(str(e))
+
+    # Converte para requests.Response para que os conectores não mudem
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.reason = response.reason_phrase
+    converted.url = str(response.url)
+    converted.headers = requests.structures.CaseInsensitiveDict(response.headers)
+    converted.encoding = response.encoding
+    converted._content = response.content
+    converted._content_consumed = True
+    return converted
+
+def iter_xml_elements(response, tag):
+    """Percorre os elementos `tag` da resposta com iterparse, à medida que chegam.
+
+    Com stream=True (motor de threads) o XML é lido direto do socket; cada
+    elemento é liberado depois de usado, então a memória não cresce com o
+    tamanho da página.
+    """
+    if response.raw is not None and not response._content_consumed:
+        response.raw.decode_content = True
+        source = response.raw
+    else:
+        source = io.BytesIO(response.content)
+    try:
+        context = ET.iterparse(source, events=('start', 'end'))
+        _, root = next(context)
+        for event, element in context:
+            if event == 'end' and element.tag == tag:
+                yield element
+                root.clear()
+    finally:
+        response.close()
+
 # --- FUNÇÕES DE BUSCA ACADÊMICA ---
+# Cada conector recebe `max_results`, o orçamento de registros da fonte. Acima
+# de uma página, usa a paginação nativa da API: cursores (OpenAlex, CrossRef,
+# CORE) são seguidos em sequência; offsets (Semantic Scholar, DOAJ) são
+# pedidos em paralelo depois da primeira página, sob o rate limit do host.
+
+DEFAULT_RESULTS_PER_SOURCE = 20
+MAX_RESULTS_PER_SOURCE = int(os.environ.get('MAX_RESULTS_PER_SOURCE', 2000))
+
+def collect_cursor_pages(first_call, next_call, extract, max_results):
+    """Segue o cursor da API até juntar `max_results` itens ou acabar o resultado.
+
+    `next_call(data)` devolve a chamada da próxima página ou None. Só a falha
+    da primeira página é propagada; depois dela, devolve o que já foi coletado.
+    """
+    items = []
+    call = first_call
+    while call is not None and len(items) < max_results:
+        try:
+            response = yield call
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            if call is first_call:
+                raise
+            log_error(f"Falha numa página da paginação; mantendo {len(items)} itens já coletados", e)
+            break
+        page = extract(data)
+        items.extend(page)
+        call = next_call(data) if page else None
+    return items[:max_results]
+
+def collect_offset_pages(make_call, extract, total_of, max_results, page_size):
+    """Busca a primeira página e, sabendo o total, as demais em paralelo.
+
+    `make_call(offset, size)` monta a chamada de cada página.
+    """
+    response = yield make_call(0, min(page_size, max_results))
+    response.raise_for_status()
+    data = response.json()
+    items = list(extract(data))
+    total = min(max_results, total_of(data))
+    if len(items) < page_size or total <= page_size:
+        return items[:max_results]
+    
+    offsets = range(page_size, total, page_size)
+    responses = yield parallel_calls(make_call(offset, min(page_size, total - offset)) for offset in offsets)
+    for page_response in responses:
+        if isinstance(page_response, Exception) or page_response.status_code != 200:
+            log_error(f"Falha em uma página da paginação ({page_response})")
+            continue
+        items.extend(extract(page_response.json()))
+    return items[:max_results]
+
+# Projeção de campos: OpenAlex e CrossRef devolvem só os campos que o parser
+# usa (o OpenAlex aceita apenas campos de primeiro nível). O Semantic Scholar
+# já exige `fields` na própria chamada; DOAJ, CORE e Web of Science não têm
+# projeção. FIELD_PROJECTION_ENABLED=0 volta aos objetos completos.
+FIELD_PROJECTION_ENABLED = os.environ.get('FIELD_PROJECTION_ENABLED', '1') != '0'
+FIELD_PROJECTIONS = {
+    'openalex': ('select', 'id,ids,doi,title,publication_year,cited_by_count,authorships,'
+                           'primary_location,abstract_inverted_index'),
+    'crossref': ('select', 'DOI,URL,title,author,created,container-title,is-referenced-by-count')
+}
 
-def search_semantic_scholar(query, min_year, min_citations):
+def field_projection(source):
+    """Parâmetro de projeção da fonte, ou {} se desativada ou não suportada"""
+    if not FIELD_PROJECTION_ENABLED or source not in FIELD_PROJECTIONS:
+        return {}
+    param, fields = FIELD_PROJECTIONS[source]
+    return {param: fields}
+
+@connector
+def search_semantic_scholar(query, min_year, min_citations, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no Semantic Scholar"""
     try:
         log_info(f"Buscando no Semantic Scholar: {query}")
         url = "https://api.semanticscholar.org/graph/v1/paper/search"
         params = {
             'query': query,
-            'limit': 20,
-            'fields': 'paperId,title,authors,year,abstract,url,citationCount,venue'
+            'fields': 'paperId,externalIds,title,authors,year,abstract,url,citationCount,venue'
         }
         
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        
-        results = response.json().get('data', [])
+        # A busca por relevância aceita offset + limit até 1000 registros
+        results = yield from collect_offset_pages(
+            lambda offset, size: http_call(url, params=dict(params, offset=offset, limit=size), timeout=15),
+            lambda data: data.get('data', []),
+            lambda data: min(data.get('total', 0), 1000),
+            max_results,
+            page_size=100
+        )
         articles = []
         
         for item in results:
@@ -114,6 +1020,8 @@ def search_semantic_scholar(query, min_year, min_citations):
                     if item.get('authors'):
                         authors = [a.get('name', 'N/A') for a in item.get('authors', [])]
                     
+                    external_ids = item.get('externalIds') or {}
+                    
                     article = {
                         'id': f"ss_{item.get('paperId', '')}",
                         'title': item.get('title', 'Título não disponível'),
@@ -123,7 +1031,10 @@ def search_semantic_scholar(query, min_year, min_citations):
                         'citations': citations,
                         'url': item.get('url', ''),
                         'abstract': item.get('abstract', 'Resumo não disponível'),
-                        'venue': item.get('venue', 'N/A')
+                        'venue': item.get('venue', 'N/A'),
+                        'doi': external_ids.get('DOI'),
+                        'arxiv_id': external_ids.get('ArXiv'),
+                        'pmid': external_ids.get('PubMed')
                     }
                     articles.append(article)
             except Exception as e:
@@ -137,22 +1048,34 @@ def search_semantic_scholar(query, min_year, min_citations):
         log_error("Erro na busca do Semantic Scholar", e)
         return []
 
-def search_crossref(query, min_year):
+@connector
+def search_crossref(query, min_year, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no CrossRef"""
     try:
         log_info(f"Buscando no CrossRef: {query}")
         url = "https://api.crossref.org/works"
         params = {
             'query.bibliographic': query,
-            'rows': 20,
+            'rows': min(max_results, 1000),
             'filter': f'from-pub-date:{min_year}-01-01',
-            'mailto': CROSSREF_MAILTO
+            'mailto': CROSSREF_MAILTO,
+            **field_projection('crossref')
         }
-        
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        
-        results = response.json()['message']['items']
+        if max_results > params['rows']:
+            params['cursor'] = '*'
+        
+        def next_page(data):
+            cursor = data['message'].get('next-cursor')
+            if 'cursor' not in params or not cursor:
+                return None
+            return http_call(url, params=dict(params, cursor=cursor), timeout=15)
+        
+        results = yield from collect_cursor_pages(
+            http_call(url, params=params, timeout=15),
+            next_page,
+            lambda data: data['message']['items'],
+            max_results
+        )
         articles = []
         
         for item in results:
@@ -181,7 +1104,8 @@ def search_crossref(query, min_year):
                         'citations': item.get('is-referenced-by-count', 0),
                         'url': item.get('URL', ''),
                         'abstract': 'Resumo não disponível no CrossRef.',
-                        'venue': journal_info
+                        'venue': journal_info,
+                        'doi': item.get('DOI')
                     }
                     articles.append(article)
             except Exception as e:
@@ -195,7 +1119,98 @@ def search_crossref(query, min_year):
         log_error("Erro na busca do CrossRef", e)
         return []
 
-def search_web_of_science(query, min_year, min_citations):
+# A Web of Science tem três endpoints com formatos de resposta diferentes. O
+# primeiro que responde fica guardado (com o formato) para as próximas buscas,
+# e uma thread refaz a sondagem periodicamente para voltar ao preferido.
+WOS_ENDPOINTS = [
+    "https://api.clarivate.com/apis/wos-starter/v1/documents",
+    "https://api.clarivate.com/api/wos",
+    "https://wos-api.clarivate.com/api/wos"
+]
+WOS_REPROBE_INTERVAL = int(os.environ.get('WOS_REPROBE_INTERVAL', 1800))
+
+_wos_endpoint = None
+_wos_endpoint_checked = None
+_wos_endpoint_lock = threading.Lock()
+_wos_probe_thread = None
+
+def extract_wos_items(data, shape=None):
+    """Devolve (formato, itens) da resposta; usa o formato já conhecido se houver"""
+    if shape == 'documents' or (shape is None and 'documents' in data):
+        return 'documents', data['documents']
+    if shape == 'records' or (shape is None and 'records' in data):
+        return 'records', data['records']
+    if shape == 'Data.Records' or (shape is None and 'Records' in data.get('Data', {})):
+        return 'Data.Records', data['Data']['Records']
+    return None, None
+
+def get_wos_endpoint():
+    """Endpoint (url, formato) que respondeu por último, ou None"""
+    _start_wos_probe()
+    with _wos_endpoint_lock:
+        return _wos_endpoint
+
+def remember_wos_endpoint(url, shape):
+    global _wos_endpoint, _wos_endpoint_checked
+    with _wos_endpoint_lock:
+        if _wos_endpoint != (url, shape):
+            log_info(f"Web of Science: usando o endpoint {url}")
+        _wos_endpoint = (url, shape)
+        _wos_endpoint_checked = time.time()
+
+def forget_wos_endpoint(url):
+    global _wos_endpoint
+    with _wos_endpoint_lock:
+        if _wos_endpoint and _wos_endpoint[0] == url:
+            log_info(f"Web of Science: endpoint {url} deixou de responder")
+            _wos_endpoint = None
+
+def probe_wos_endpoints():
+    """Sonda os endpoints em ordem de preferência e guarda o primeiro que funciona"""
+    headers = {
+        'X-ApiKey': WOS_API_KEY,
+        'Accept': 'application/json',
+        'User-Agent': 'Academic-Research-Tool/1.0'
+    }
+    params = {'q': 'science', 'db': 'WOS', 'limit': 1}
+    for endpoint in WOS_ENDPOINTS:
+        try:
+            response = http_get(endpoint, headers=headers, params=params, timeout=20)
+            if response.status_code == 401:
+                log_error("Web of Science: API key inválida")
+                return None
+            if response.status_code == 200:
+                shape, _ = extract_wos_items(response.json())
+                if shape:
+                    remember_wos_endpoint(endpoint, shape)
+                    return endpoint
+        except Exception as e:
+            log_error(f"Web of Science: falha ao sondar {endpoint}", e)
+        forget_wos_endpoint(endpoint)
+    return None
+
+def _wos_probe_loop():
+    while True:
+        time.sleep(WOS_REPROBE_INTERVAL)
+        probe_wos_endpoints()
+
+def _start_wos_probe():
+    global _wos_probe_thread
+    with _wos_endpoint_lock:
+        if _wos_probe_thread is None and WOS_API_KEY and WOS_REPROBE_INTERVAL > 0:
+            _wos_probe_thread = threading.Thread(target=_wos_probe_loop, name='wos-sondagem', daemon=True)
+            _wos_probe_thread.start()
+
+def get_wos_endpoint_state():
+    with _wos_endpoint_lock:
+        return {
+            'endpoint': _wos_endpoint[0] if _wos_endpoint else None,
+            'format': _wos_endpoint[1] if _wos_endpoint else None,
+            'checked_at': _wos_endpoint_checked
+        }
+
+@connector
+def search_web_of_science(query, min_year, min_citations, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca na Web of Science com tratamento robusto de erros"""
     if not WOS_API_KEY:
         log_info("Web of Science: API key não configurada")
@@ -204,11 +1219,11 @@ def search_web_of_science(query, min_year, min_citations):
     try:
         log_info(f"Buscando na Web of Science: {query}")
         
-        endpoints = [
-            "https://api.clarivate.com/apis/wos-starter/v1/documents",
-            "https://api.clarivate.com/api/wos",
-            "https://wos-api.clarivate.com/api/wos"
-        ]
+        # Vai direto ao endpoint conhecido; os outros só entram se ele falhar
+        known = get_wos_endpoint()
+        known_url, known_shape = known if known else (None, None)
+        endpoints = [known_url] if known_url else []
+        endpoints += [endpoint for endpoint in WOS_ENDPOINTS if endpoint != known_url]
         
         headers = {
             'X-ApiKey': WOS_API_KEY,
@@ -216,10 +1231,11 @@ def search_web_of_science(query, min_year, min_citations):
             'User-Agent': 'Academic-Research-Tool/1.0'
         }
         
+        # Sem paginação: os três endpoints não concordam no parâmetro de página
         params = {
             'q': query,
             'db': 'WOS',
-            'limit': 20,
+            'limit': min(max_results, 50),
             'sortBy': 'relevance'
         }
         
@@ -228,20 +1244,17 @@ def search_web_of_science(query, min_year, min_citations):
         for endpoint in endpoints:
             try:
                 log_info(f"Tentando endpoint: {endpoint}")
-                response = requests.get(endpoint, headers=headers, params=params, timeout=20)
+                response = yield http_call(endpoint, headers=headers, params=params, timeout=20)
                 
                 if response.status_code == 200:
                     data = response.json()
                     
-                    if 'documents' in data:
-                        items = data['documents']
-                    elif 'records' in data:
-                        items = data['records']
-                    elif 'Data' in data and 'Records' in data['Data']:
-                        items = data['Data']['Records']
-                    else:
+                    shape, items = extract_wos_items(data, known_shape if endpoint == known_url else None)
+                    if shape is None:
                         log_info("Web of Science: Formato de resposta não reconhecido")
+                        forget_wos_endpoint(endpoint)
                         continue
+                    remember_wos_endpoint(endpoint, shape)
                     
                     for item in items:
                         try:
@@ -289,7 +1302,8 @@ def search_web_of_science(query, min_year, min_citations):
                                 'citations': citations,
                                 'url': url,
                                 'abstract': abstract,
-                                'venue': venue
+                                'venue': venue,
+                                'doi': doi or None
                             }
                             articles.append(article)
                             
@@ -302,23 +1316,28 @@ def search_web_of_science(query, min_year, min_citations):
                     
                 elif response.status_code == 429:
                     log_error("Web of Science: Rate limit excedido")
-                    time.sleep(2)
                     continue
                 elif response.status_code == 401:
                     log_error("Web of Science: API key inválida")
                     break
                 elif response.status_code == 512:
                     log_error("Web of Science: Erro interno do servidor (512)")
+                    forget_wos_endpoint(endpoint)
                     continue
                 else:
                     log_error(f"Web of Science: HTTP {response.status_code}")
+                    forget_wos_endpoint(endpoint)
                     continue
                     
+            except CircuitOpenError:
+                raise
             except requests.exceptions.Timeout:
                 log_error(f"Web of Science: Timeout no endpoint {endpoint}")
+                forget_wos_endpoint(endpoint)
                 continue
             except Exception as e:
                 log_error(f"Web of Science: Erro no endpoint {endpoint}", e)
+                forget_wos_endpoint(endpoint)
                 continue
         
         log_info("Web of Science: Todos os endpoints falharam")
@@ -328,7 +1347,8 @@ def search_web_of_science(query, min_year, min_citations):
         log_error("Erro geral na busca da Web of Science", e)
         return []
 
-def search_doaj(query, min_year):
+@connector
+def search_doaj(query, min_year, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no Directory of Open Access Journals (DOAJ)"""
     try:
         log_info(f"Buscando no DOAJ: {query}")
@@ -337,7 +1357,6 @@ def search_doaj(query, min_year):
         
         params = {
             'q': query,
-            'pageSize': 20,
             'sort': 'title'
         }
         
@@ -346,14 +1365,20 @@ def search_doaj(query, min_year):
             'User-Agent': 'Academic-Research-Tool/1.0'
         }
         
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        data = response.json()
+        # Páginas numeradas a partir de 1; o offset vira número de página
+        page_size = min(max_results, 100)
+        results = yield from collect_offset_pages(
+            lambda offset, size: http_call(
+                url, params=dict(params, page=offset // page_size + 1, pageSize=page_size),
+                headers=headers, timeout=15
+            ),
+            lambda data: data.get('results', []),
+            lambda data: data.get('total', 0),
+            max_results,
+            page_size=page_size
+        )
         articles = []
         
-        results = data.get('results', [])
-        
         for item in results:
             try:
                 bibjson = item.get('bibjson', {})
@@ -399,11 +1424,14 @@ def search_doaj(query, min_year):
                         url = link.get('url', '')
                         break
                 
-                if not url and bibjson.get('identifier'):
-                    for identifier in bibjson['identifier']:
-                        if identifier.get('type') == 'doi':
-                            url = f"https://doi.org/{identifier.get('id')}"
-                            break
+                doi = None
+                for identifier in bibjson.get('identifier', []):
+                    if identifier.get('type') == 'doi':
+                        doi = identifier.get('id')
+                        break
+                
+                if not url and doi:
+                    url = f"https://doi.org/{doi}"
                 
                 article = {
                     'id': f"doaj_{item.get('id', str(time.time()))}",
@@ -414,7 +1442,8 @@ def search_doaj(query, min_year):
                     'citations': 0,
                     'url': url,
                     'abstract': abstract,
-                    'venue': journal_title
+                    'venue': journal_title,
+                    'doi': doi
                 }
                 articles.append(article)
                 
@@ -429,7 +1458,8 @@ def search_doaj(query, min_year):
         log_error("Erro na busca do DOAJ", e)
         return []
 
-def search_arxiv(query, min_year):
+@connector
+def search_arxiv(query, min_year, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no arXiv"""
     try:
         log_info(f"Buscando no arXiv: {query}")
@@ -438,70 +1468,90 @@ def search_arxiv(query, min_year):
         
         params = {
             'search_query': f'all:{query}',
-            'start': 0,
-            'max_results': 20,
             'sortBy': 'relevance',
             'sortOrder': 'descending'
         }
         
-        response = requests.get(base_url, params=params, timeout=15)
-        response.raise_for_status()
-        
-        root = ET.fromstring(response.content)
         namespace = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
-        
         articles = []
-        entries = root.findall('atom:entry', namespace)
         
-        for entry in entries:
+        # O arXiv pede uma chamada a cada 3s, então as páginas saem em sequência
+        page_size = min(max_results, 100)
+        for start in range(0, max_results, page_size):
+            page_params = dict(params, start=start, max_results=min(page_size, max_results - start))
             try:
-                title_elem = entry.find('atom:title', namespace)
-                title = title_elem.text.strip() if title_elem is not None else 'Título não disponível'
-                
-                authors = []
-                author_elems = entry.findall('atom:author', namespace)
-                for author_elem in author_elems:
-                    name_elem = author_elem.find('atom:name', namespace)
-                    if name_elem is not None:
-                        authors.append(name_elem.text.strip())
-                
-                published_elem = entry.find('atom:published', namespace)
-                year = datetime.datetime.now().year
-                if published_elem is not None:
-                    try:
-                        published_date = datetime.datetime.strptime(published_elem.text[:10], '%Y-%m-%d')
-                        year = published_date.year
-                    except:
-                        pass
-                
-                if year < min_year:
-                    continue
-                
-                summary_elem = entry.find('atom:summary', namespace)
-                abstract = summary_elem.text.strip() if summary_elem is not None else 'Resumo não disponível'
-                
-                id_elem = entry.find('atom:id', namespace)
-                url = id_elem.text if id_elem is not None else ''
-                
-                category_elem = entry.find('atom:category', namespace)
-                category = category_elem.get('term') if category_elem is not None else 'N/A'
-                
-                article = {
-                    'id': f"arxiv_{url.split('/')[-1] if url else str(time.time())}",
-                    'title': title,
-                    'authors': authors,
-                    'year': year,
-                    'source': f"arXiv ({category})",
-                    'citations': 0,
-                    'url': url,
-                    'abstract': abstract,
-                    'venue': 'arXiv Preprint'
-                }
-                articles.append(article)
-                
+                response = yield http_call(base_url, params=page_params, timeout=15, stream=True)
+                if response.status_code != 200:
+                    response.close()
+                response.raise_for_status()
             except Exception as e:
-                log_error(f"Erro ao processar item do arXiv: {e}")
-                continue
+                # Só a primeira página é obrigatória; depois fica o que já chegou
+                if not start:
+                    raise
+                log_error(f"arXiv: falha na página a partir de {start}; mantendo {len(articles)} artigos", e)
+                break
+            
+            received = 0
+            entries = iter_xml_elements(response, f"{{{namespace['atom']}}}entry")
+            
+            for entry in entries:
+                received += 1
+                try:
+                    title_elem = entry.find('atom:title', namespace)
+                    title = title_elem.text.strip() if title_elem is not None else 'Título não disponível'
+                    
+                    authors = []
+                    author_elems = entry.findall('atom:author', namespace)
+                    for author_elem in author_elems:
+                        name_elem = author_elem.find('atom:name', namespace)
+                        if name_elem is not None:
+                            authors.append(name_elem.text.strip())
+                    
+                    published_elem = entry.find('atom:published', namespace)
+                    year = datetime.datetime.now().year
+                    if published_elem is not None:
+                        try:
+                            published_date = datetime.datetime.strptime(published_elem.text[:10], '%Y-%m-%d')
+                            year = published_date.year
+                        except:
+                            pass
+                    
+                    if year < min_year:
+                        continue
+                    
+                    summary_elem = entry.find('atom:summary', namespace)
+                    abstract = summary_elem.text.strip() if summary_elem is not None else 'Resumo não disponível'
+                    
+                    id_elem = entry.find('atom:id', namespace)
+                    url = id_elem.text if id_elem is not None else ''
+                    
+                    category_elem = entry.find('atom:category', namespace)
+                    category = category_elem.get('term') if category_elem is not None else 'N/A'
+                    
+                    doi_elem = entry.find('arxiv:doi', namespace)
+                    doi = doi_elem.text.strip() if doi_elem is not None and doi_elem.text else None
+                    
+                    article = {
+                        'id': f"arxiv_{url.split('/')[-1] if url else str(time.time())}",
+                        'title': title,
+                        'authors': authors,
+                        'year': year,
+                        'source': f"arXiv ({category})",
+                        'citations': 0,
+                        'url': url,
+                        'abstract': abstract,
+                        'venue': 'arXiv Preprint',
+                        'doi': doi,
+                        'arxiv_id': url.split('/abs/')[-1] if '/abs/' in url else None
+                    }
+                    articles.append(article)
+                    
+                except Exception as e:
+                    log_error(f"Erro ao processar item do arXiv: {e}")
+                    continue
+            
+            if received < page_params['max_results']:
+                break
         
         log_info(f"arXiv: {len(articles)} artigos encontrados")
         return articles
@@ -510,7 +1560,58 @@ def search_arxiv(query, min_year):
         log_error("Erro na busca do arXiv", e)
         return []
 
-def search_openalex(query, min_year, min_citations):
+# O OpenAlex não devolve o resumo em texto, só o índice invertido
+# {palavra: [posições]}. A lista de posições é alocada de uma vez pelo total de
+# ocorrências (sem lacunas, a última posição é total - 1). Como cada posição
+# ocupa pelo menos um caractere no texto, só as `max_chars + 1` primeiras a
+# partir da primeira palavra podem aparecer no trecho truncado: nos resumos
+# mais longos que isso, as posições seguintes nem são preenchidas.
+OPENALEX_ABSTRACT_MAX_CHARS = 500
+
+def _fill_inverted_slots(inverted_index, size, limit):
+    """Lista de `size` posições com as palavras do índice abaixo de `limit`"""
+    slots = [''] * size
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            if pos < limit:
+                try:
+                    slots[pos] = word
+                except IndexError:
+                    slots.extend([''] * (pos + 1 - len(slots)))
+                    slots[pos] = word
+    return slots
+
+def rebuild_inverted_abstract(inverted_index, max_chars=OPENALEX_ABSTRACT_MAX_CHARS):
+    """Remonta o resumo a partir do índice invertido, truncado em `max_chars`"""
+    total = sum(map(len, inverted_index.values()))
+    if max_chars is None or total <= max_chars + 1:
+        slots = _fill_inverted_slots(inverted_index, total, float('inf'))
+        text = ' '.join(slots).strip()
+        if max_chars is not None and len(text) > max_chars:
+            return text[:max_chars] + '...'
+        return text
+    
+    # Resumo longo: basta a janela de max_chars + 1 posições a partir da
+    # primeira palavra, e o texto dela sempre passa do corte
+    window = max_chars + 1
+    slots = _fill_inverted_slots(inverted_index, window, window)
+    if not slots[0]:
+        first = min(map(min, filter(None, inverted_index.values())))
+        slots = _fill_inverted_slots(inverted_index, first + window, first + window)[first:]
+    return ' '.join(slots)[:max_chars] + '...'
+
+def rebuild_inverted_abstracts(inverted_indexes, max_chars=OPENALEX_ABSTRACT_MAX_CHARS):
+    """Remonta os resumos de uma página inteira (None para índices ausentes)"""
+    abstracts = []
+    for inverted_index in inverted_indexes:
+        try:
+            abstracts.append(rebuild_inverted_abstract(inverted_index, max_chars) if inverted_index else None)
+        except (TypeError, AttributeError):
+            abstracts.append(None)
+    return abstracts
+
+@connector
+def search_openalex(query, min_year, min_citations, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no OpenAlex"""
     try:
         log_info(f"Buscando no OpenAlex: {query}")
@@ -520,25 +1621,45 @@ def search_openalex(query, min_year, min_citations):
         params = {
             'search': query,
             'filter': f'publication_year:>{min_year-1},cited_by_count:>{min_citations-1}',
-            'per-page': 20,
+            'per-page': min(max_results, 200),
             'sort': 'cited_by_count:desc',
-            'mailto': OPENALEX_EMAIL
+            'mailto': OPENALEX_EMAIL,
+            **field_projection('openalex')
         }
+        if max_results > params['per-page']:
+            params['cursor'] = '*'
         
         headers = {
             'Accept': 'application/json',
             'User-Agent': f'Academic-Research-Tool/1.0 (mailto:{OPENALEX_EMAIL})'
         }
         
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        data = response.json()
+        def next_page(data):
+            cursor = (data.get('meta') or {}).get('next_cursor')
+            if 'cursor' not in params or not cursor:
+                return None
+            return http_call(url, params=dict(params, cursor=cursor), headers=headers, timeout=15)
+        
+        results = yield from collect_cursor_pages(
+            http_call(url, params=params, headers=headers, timeout=15),
+            next_page,
+            lambda data: data.get('results', []),
+            max_results
+        )
         articles = []
         
-        results = data.get('results', [])
+        # Filtra antes de remontar os resumos, que são a parte cara da página
+        kept = [
+            item for item in results
+            if (item.get('publication_year') or 0) >= min_year
+            and (item.get('cited_by_count') or 0) >= min_citations
+        ]
+        abstracts = rebuild_inverted_abstracts(
+            item.get('abstract_inverted_index') if isinstance(item.get('abstract_inverted_index'), dict) else None
+            for item in kept
+        )
         
-        for item in results:
+        for item, abstract in zip(kept, abstracts):
             try:
                 title = item.get('title', 'Título não disponível')
                 
@@ -553,35 +1674,22 @@ def search_openalex(query, min_year, min_citations):
                 year = item.get('publication_year', datetime.datetime.now().year)
                 citations = item.get('cited_by_count', 0)
                 
-                if year < min_year or citations < min_citations:
-                    continue
-                
-                host_venue = item.get('host_venue', {}) or {}
-                venue = host_venue.get('display_name', 'N/A')
+                # host_venue saiu da API (e não é aceito no select); o veículo
+                # agora vem de primary_location.source
+                venue_source = (item.get('primary_location') or {}).get('source') or item.get('host_venue') or {}
+                venue = venue_source.get('display_name') or 'N/A'
                 
-                abstract_url = item.get('abstract_inverted_index')
-                abstract = 'Resumo não disponível no OpenAlex.'
+                if abstract is None:
+                    abstract = 'Resumo não disponível no OpenAlex.'
                 
-                if abstract_url and isinstance(abstract_url, dict):
-                    try:
-                        words = []
-                        for word, positions in abstract_url.items():
-                            for pos in positions:
-                                while len(words) <= pos:
-                                    words.append('')
-                                words[pos] = word
-                        abstract = ' '.join(words).strip()
-                        if len(abstract) > 500:
-                            abstract = abstract[:500] + '...'
-                    except:
-                        pass
-                
-                url_item = item.get('doi', '')
-                if url_item:
-                    url_item = f"https://doi.org/{url_item.replace('https://doi.org/', '')}"
+                doi = (item.get('doi') or '').replace('https://doi.org/', '') or None
+                if doi:
+                    url_item = f"https://doi.org/{doi}"
                 else:
                     url_item = item.get('id', '')
                 
+                pmid = ((item.get('ids') or {}).get('pmid') or '').rstrip('/').split('/')[-1] or None
+                
                 article = {
                     'id': f"oa_{item.get('id', '').split('/')[-1]}",
                     'title': title,
@@ -591,7 +1699,9 @@ def search_openalex(query, min_year, min_citations):
                     'citations': citations,
                     'url': url_item,
                     'abstract': abstract,
-                    'venue': venue
+                    'venue': venue,
+                    'doi': doi,
+                    'pmid': pmid
                 }
                 articles.append(article)
                 
@@ -606,7 +1716,66 @@ def search_openalex(query, min_year, min_citations):
         log_error("Erro na busca do OpenAlex", e)
         return []
 
-def search_pubmed(query, min_year):
+# PubMed: esearch guarda o resultado no History server do NCBI e os registros
+# são baixados em blocos de efetch simultâneos (limitados pelo rate limit).
+PUBMED_FETCH_CHUNK = int(os.environ.get('PUBMED_FETCH_CHUNK', 200))
+
+def parse_pubmed_article(pubmed_article):
+    # Caminhos diretos em vez de buscas './/' por toda a subárvore
+    article_elem = pubmed_article.find('MedlineCitation/Article')
+    if article_elem is None:
+        article_elem = ET.Element('Article')
+    
+    title_elem = article_elem.find('ArticleTitle')
+    title = title_elem.text if title_elem is not None else 'Título não disponível'
+    
+    authors = []
+    author_list = article_elem.findall('AuthorList/Author')
+    for author in author_list:
+        lastname = author.find('LastName')
+        forename = author.find('ForeName')
+        if lastname is not None and forename is not None:
+            authors.append(f"{forename.text} {lastname.text}")
+        elif lastname is not None:
+            authors.append(lastname.text)
+    
+    year_elem = article_elem.find('Journal/JournalIssue/PubDate/Year')
+    year = datetime.datetime.now().year
+    if year_elem is not None:
+        try:
+            year = int(year_elem.text)
+        except:
+            pass
+    
+    journal_elem = article_elem.find('Journal/Title')
+    journal = journal_elem.text if journal_elem is not None else 'N/A'
+    
+    abstract_elem = article_elem.find('Abstract/AbstractText')
+    abstract = abstract_elem.text if abstract_elem is not None else 'Resumo não disponível no PubMed.'
+    
+    pmid_elem = pubmed_article.find('MedlineCitation/PMID')
+    pmid = pmid_elem.text if pmid_elem is not None else ''
+    url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else ''
+    
+    doi_elem = pubmed_article.find('PubmedData/ArticleIdList/ArticleId[@IdType="doi"]')
+    doi = doi_elem.text if doi_elem is not None else None
+    
+    return {
+        'id': f"pm_{pmid}",
+        'title': title,
+        'authors': authors,
+        'year': year,
+        'source': f"PubMed ({journal})",
+        'citations': 0,
+        'url': url,
+        'abstract': abstract,
+        'venue': journal,
+        'doi': doi,
+        'pmid': pmid or None
+    }
+
+@connector
+def search_pubmed(query, min_year, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no PubMed via API do NCBI"""
     try:
         log_info(f"Buscando no PubMed: {query}")
@@ -615,91 +1784,68 @@ def search_pubmed(query, min_year):
         search_params = {
             'db': 'pubmed',
             'term': f"{query} AND {min_year}:3000[pdat]",
-            'retmax': 20,
+            'retmax': 0,
+            'usehistory': 'y',
             'retmode': 'json'
         }
+        if NCBI_API_KEY:
+            search_params['api_key'] = NCBI_API_KEY
         
-        search_response = requests.get(search_url, params=search_params, timeout=15)
+        search_response = yield http_call(search_url, params=search_params, timeout=15)
         search_response.raise_for_status()
         
-        search_data = search_response.json()
-        ids = search_data.get('esearchresult', {}).get('idlist', [])
+        search_data = search_response.json().get('esearchresult', {})
+        total = min(int(search_data.get('count', 0)), max_results)
         
-        if not ids:
+        if not total:
             log_info("PubMed: Nenhum resultado encontrado")
             return []
         
         fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-        fetch_params = {
+        base_params = {
             'db': 'pubmed',
-            'id': ','.join(ids),
+            'query_key': search_data.get('querykey'),
+            'WebEnv': search_data.get('webenv'),
             'retmode': 'xml'
         }
+        if NCBI_API_KEY:
+            base_params['api_key'] = NCBI_API_KEY
         
-        fetch_response = requests.get(fetch_url, params=fetch_params, timeout=15)
-        fetch_response.raise_for_status()
+        chunks = [
+            dict(base_params, retstart=start, retmax=min(PUBMED_FETCH_CHUNK, total - start))
+            for start in range(0, total, PUBMED_FETCH_CHUNK)
+        ]
+        responses = yield parallel_calls(
+            http_call(fetch_url, params=params, timeout=30, stream=True) for params in chunks
+        )
         
-        root = ET.fromstring(fetch_response.content)
         articles = []
-        
-        for pubmed_article in root.findall('.//PubmedArticle'):
+        for fetch_response in responses:
+            if isinstance(fetch_response, Exception) or fetch_response.status_code != 200:
+                log_error(f"PubMed: falha em um bloco do efetch ({fetch_response})")
+                if not isinstance(fetch_response, Exception):
+                    fetch_response.close()
+                continue
+            
             try:
-                title_elem = pubmed_article.find('.//ArticleTitle')
-                title = title_elem.text if title_elem is not None else 'Título não disponível'
-                
-                authors = []
-                author_list = pubmed_article.findall('.//Author')
-                for author in author_list:
-                    lastname = author.find('LastName')
-                    forename = author.find('ForeName')
-                    if lastname is not None and forename is not None:
-                        authors.append(f"{forename.text} {lastname.text}")
-                    elif lastname is not None:
-                        authors.append(lastname.text)
-                
-                year_elem = pubmed_article.find('.//PubDate/Year')
-                year = datetime.datetime.now().year
-                if year_elem is not None:
+                for pubmed_article in iter_xml_elements(fetch_response, 'PubmedArticle'):
                     try:
-                        year = int(year_elem.text)
-                    except:
-                        pass
-                
-                journal_elem = pubmed_article.find('.//Journal/Title')
-                journal = journal_elem.text if journal_elem is not None else 'N/A'
-                
-                abstract_elem = pubmed_article.find('.//AbstractText')
-                abstract = abstract_elem.text if abstract_elem is not None else 'Resumo não disponível no PubMed.'
-                
-                pmid_elem = pubmed_article.find('.//PMID')
-                pmid = pmid_elem.text if pmid_elem is not None else ''
-                url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else ''
-                
-                article = {
-                    'id': f"pm_{pmid}",
-                    'title': title,
-                    'authors': authors,
-                    'year': year,
-                    'source': f"PubMed ({journal})",
-                    'citations': 0,
-                    'url': url,
-                    'abstract': abstract,
-                    'venue': journal
-                }
-                articles.append(article)
-                
+                        articles.append(parse_pubmed_article(pubmed_article))
+                    except Exception as e:
+                        log_error(f"Erro ao processar item do PubMed: {e}")
+                        continue
             except Exception as e:
-                log_error(f"Erro ao processar item do PubMed: {e}")
-                continue
+                log_error("PubMed: bloco do efetch interrompido; mantendo os artigos já lidos", e)
         
-        log_info(f"PubMed: {len(articles)} artigos encontrados")
+        log_info(f"PubMed: {len(articles)} artigos encontrados ({len(chunks)} bloco(s) de efetch)")
         return articles
         
     except Exception as e:
         log_error("Erro na busca do PubMed", e)
         return []
 
-def search_core(query, min_year):
+@connector
+def search_core(query, min_year, max_results=DEFAULT_RESULTS_PER_SOURCE):
     """Busca no CORE"""
     if not CORE_API_KEY:
         log_info("CORE: API key não configurada")
@@ -717,18 +1863,24 @@ def search_core(query, min_year):
         
         params = {
             'q': query,
-            'limit': 20,
-            'scroll': False
+            'limit': min(max_results, 100),
+            'scroll': max_results > 100
         }
         
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        response.raise_for_status()
-        
-        data = response.json()
+        def next_page(data):
+            scroll_id = data.get('scrollId')
+            if not params['scroll'] or not scroll_id:
+                return None
+            return http_call(url, headers=headers, params=dict(params, scrollId=scroll_id), timeout=15)
+        
+        results = yield from collect_cursor_pages(
+            http_call(url, headers=headers, params=params, timeout=15),
+            next_page,
+            lambda data: data.get('results', []),
+            max_results
+        )
         articles = []
         
-        results = data.get('results', [])
-        
         for item in results:
             try:
                 title = item.get('title', 'Título não disponível')
@@ -767,7 +1919,8 @@ def search_core(query, min_year):
                     'citations': 0,
                     'url': url,
                     'abstract': abstract,
-                    'venue': journal
+                    'venue': journal,
+                    'doi': item.get('doi')
                 }
                 articles.append(article)
                 
@@ -782,51 +1935,503 @@ def search_core(query, min_year):
         log_error("Erro na busca do CORE", e)
         return []
 
-def search_all_sources(query, min_year, min_citations, selected_sources=None):
-    """Busca em todas as fontes acadêmicas disponíveis"""
+# --- CACHE DE RESPOSTAS DAS FONTES ---
+# Dois níveis: LRU em memória e SQLite em disco, com TTL por fonte.
+# Os artigos são guardados como JSON, então cada leitura devolve cópias novas.
+
+SEARCH_CACHE_ENABLED = os.environ.get('SEARCH_CACHE_ENABLED', '1') != '0'
+SEARCH_CACHE_DB = os.environ.get('SEARCH_CACHE_DB', 'search_cache.sqlite3')
+SEARCH_CACHE_MEMORY_ITEMS = int(os.environ.get('SEARCH_CACHE_MEMORY_ITEMS', 512))
+SEARCH_CACHE_DISK_ITEMS = int(os.environ.get('SEARCH_CACHE_DISK_ITEMS', 20000))
+SEARCH_CACHE_DEFAULT_TTL = int(os.environ.get('SEARCH_CACHE_TTL', 24 * 3600))
+
+# TTL em segundos; pode ser sobrescrito com SEARCH_CACHE_TTL_<FONTE>
+SOURCE_CACHE_TTL = {
+    'semantic_scholar': 24 * 3600,
+    'crossref': 24 * 3600,
+    'web_of_science': 24 * 3600,
+    'doaj': 24 * 3600,
+    'arxiv': 6 * 3600,
+    'openalex': 24 * 3600,
+    'pubmed': 12 * 3600,
+    'core': 24 * 3600
+}
+
+_memory_cache = OrderedDict()
+_memory_cache_lock = threading.Lock()
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+_cache_stats = defaultdict(int)
+
+def get_source_cache_ttl(source):
+    env_value = os.environ.get(f'SEARCH_CACHE_TTL_{source.upper()}')
+    if env_value:
+        return int(env_value)
+    return SOURCE_CACHE_TTL.get(source, SEARCH_CACHE_DEFAULT_TTL)
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+def response_cache_key(source, args):
+    """Chave estável a partir da fonte, query normalizada e filtros"""
+    query, *filters = args
+    return json.dumps([source, normalize_query(query), *filters])
+
+def _get_disk_cache():
+    global _disk_cache
+    if _disk_cache is None:
+        connection = sqlite3.connect(SEARCH_CACHE_DB, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, source TEXT, payload TEXT, expires_at REAL, created_at REAL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at)')
+        connection.commit()
+        _disk_cache = connection
+    return _disk_cache
+
+def _memory_cache_put(key, payload, expires_at):
+    with _memory_cache_lock:
+        _memory_cache[key] = (payload, expires_at)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > SEARCH_CACHE_MEMORY_ITEMS:
+            _memory_cache.popitem(last=False)
+            _cache_stats['memory_evictions'] += 1
+
+def response_cache_get(source, key):
+    """Retorna os artigos em cache ou None"""
+    if not SEARCH_CACHE_ENABLED:
+        return None
+
+    now = time.time()
+    with _memory_cache_lock:
+        entry = _memory_cache.get(key)
+        if entry is not None:
+            payload, expires_at = entry
+            if expires_at > now:
+                _memory_cache.move_to_end(key)
+                _cache_stats['memory_hits'] += 1
+                return json.loads(payload)
+            del _memory_cache[key]
+            _cache_stats['expired'] += 1
+
+    try:
+        with _disk_cache_lock:
+            row = _get_disk_cache().execute(
+                'SELECT payload, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        log_error("Erro ao ler o cache de respostas", e)
+        row = None
+
+    if row is not None and row[1] > now:
+        _cache_stats['disk_hits'] += 1
+        _memory_cache_put(key, row[0], row[1])
+        return json.loads(row[0])
+
+    if row is not None:
+        _cache_stats['expired'] += 1
+    _cache_stats['misses'] += 1
+    return None
+
+def response_cache_put(source, key, articles):
+    """Guarda o resultado de uma fonte (listas vazias não são guardadas)"""
+    if not SEARCH_CACHE_ENABLED or not articles:
+        return
+
+    now = time.time()
+    expires_at = now + get_source_cache_ttl(source)
+    payload = json.dumps(articles, ensure_ascii=False)
+    _memory_cache_put(key, payload, expires_at)
+
+    try:
+        with _disk_cache_lock:
+            connection = _get_disk_cache()
+            connection.execute(
+                'INSERT OR REPLACE INTO responses (key, source, payload, expires_at, created_at) VALUES (?, ?, ?, ?, ?)',
+                (key, source, payload, expires_at, now)
+            )
+            expired = connection.execute('DELETE FROM responses WHERE expires_at <= ?', (now,)).rowcount
+            overflow = connection.execute(
+                'DELETE FROM responses WHERE key IN ('
+                'SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (SEARCH_CACHE_DISK_ITEMS,)
+            ).rowcount
+            connection.commit()
+        _cache_stats['expired'] += max(0, expired)
+        _cache_stats['disk_evictions'] += max(0, overflow)
+    except sqlite3.Error as e:
+        log_error("Erro ao gravar no cache de respostas", e)
+
+def get_response_cache_stats():
+    with _memory_cache_lock:
+        memory_items = len(_memory_cache)
+    stats = dict(_cache_stats)
+    stats['memory_items'] = memory_items
+    stats['enabled'] = SEARCH_CACHE_ENABLED
+    return stats
+
+# --- ORQUESTRAÇÃO DAS BUSCAS ---
+
+DEFAULT_SOURCES = [
+    'semantic_scholar', 'crossref', 'doaj', 'arxiv',
+    'openalex', 'pubmed', 'web_of_science', 'core'
+]
+
+# Conector de cada fonte e se ele aceita o filtro de citações
+SOURCE_CONNECTORS = {
+    'semantic_scholar': (search_semantic_scholar, True),
+    'crossref': (search_crossref, False),
+    'web_of_science': (search_web_of_science, True),
+    'doaj': (search_doaj, False),
+    'arxiv': (search_arxiv, False),
+    'openalex': (search_openalex, True),
+    'pubmed': (search_pubmed, False),
+    'core': (search_core, False)
+}
+
+# Máximo de chamadas simultâneas por fonte (respeita os limites de cada API)
+SOURCE_CONCURRENCY = {
+    'semantic_scholar': 2,
+    'crossref': 3,
+    'web_of_science': 2,
+    'doaj': 3,
+    'arxiv': 1,
+    'openalex': 4,
+    'pubmed': 3,
+    'core': 2
+}
+
+# Prazo máximo de uma busca; o cliente pode pedir um orçamento menor
+SEARCH_TIMEOUT = 60
+SEARCH_MIN_BUDGET = 1
+# Folga para recolher os resultados que terminam junto com o prazo
+SEARCH_DEADLINE_GRACE = 0.5
+
+class SourceSearchError(Exception):
+    """Busca numa fonte que terminou sem resultados por timeout ou erro"""
     
-    if selected_sources is None:
-        selected_sources = [
-            'semantic_scholar', 'crossref', 'doaj', 'arxiv', 
-            'openalex', 'pubmed', 'web_of_science', 'core'
-        ]
+    def __init__(self, source, status, message):
+        super().__init__(message)
+        self.source = source
+        self.status = status
+
+class SearchReport:
+    """Status de cada fonte numa busca (ok, timeout, error ou circuit_open)"""
     
-    search_functions = {
-        'semantic_scholar': lambda: search_semantic_scholar(query, min_year, min_citations),
-        'crossref': lambda: search_crossref(query, min_year),
-        'web_of_science': lambda: search_web_of_science(query, min_year, min_citations),
-        'doaj': lambda: search_doaj(query, min_year),
-        'arxiv': lambda: search_arxiv(query, min_year),
-        'openalex': lambda: search_openalex(query, min_year, min_citations),
-        'pubmed': lambda: search_pubmed(query, min_year),
-        'core': lambda: search_core(query, min_year)
-    }
+    def __init__(self):
+        self.sources = defaultdict(lambda: {'statuses': defaultdict(int), 'articles': 0})
+        self.lock = threading.Lock()
     
-    all_articles = []
+    def record(self, source, status, articles=0):
+        with self.lock:
+            entry = self.sources[source]
+            entry['statuses'][status] += 1
+            entry['articles'] += articles
     
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        future_to_source = {}
-        
-        for source in selected_sources:
-            if source in search_functions:
-                future = executor.submit(search_functions[source])
-                future_to_source[future] = source
-        
-        for future in as_completed(future_to_source, timeout=60):
-            source = future_to_source[future]
+    def record_error(self, source, error):
+        if isinstance(error, CircuitOpenError):
+            log_info(str(error))
+            self.record(source, 'circuit_open')
+        elif isinstance(error, SourceSearchError):
+            log_error(f"Busca em {source} sem resultados: {error}")
+            self.record(source, error.status)
+        else:
+            log_error(f"Falha na busca em {source}", error)
+            self.record(source, 'error')
+    
+    def as_dict(self):
+        report = {}
+        with self.lock:
+            for source, entry in self.sources.items():
+                statuses = dict(entry['statuses'])
+                if set(statuses) == {'ok'}:
+                    status = 'ok'
+                elif 'ok' in statuses:
+                    status = 'partial'
+                else:
+                    status = next(s for s in ('timeout', 'error', 'circuit_open') if s in statuses)
+                report[source] = {'status': status, 'tasks': statuses, 'articles': entry['articles']}
+        return report
+
+def get_search_budget(value):
+    """Orçamento de latência pedido pelo cliente, limitado a SEARCH_TIMEOUT"""
+    try:
+        budget = float(value)
+    except (TypeError, ValueError):
+        return SEARCH_TIMEOUT
+    return min(SEARCH_TIMEOUT, max(SEARCH_MIN_BUDGET, budget))
+
+def get_result_budget(value):
+    """Orçamento de registros por fonte pedido pelo cliente"""
+    try:
+        budget = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RESULTS_PER_SOURCE
+    return min(MAX_RESULTS_PER_SOURCE, max(1, budget))
+
+def _connector_call(source, query, min_year, min_citations, max_results=DEFAULT_RESULTS_PER_SOURCE):
+    connector_function, uses_citations = SOURCE_CONNECTORS[source]
+    if uses_citations:
+        return connector_function, (query, min_year, min_citations, max_results)
+    return connector_function, (query, min_year, max_results)
+
+def _source_budget(source, deadline):
+    """RetryBudget com o tempo que resta até o prazo da busca"""
+    remaining = SEARCH_RETRY_DEADLINE
+    if deadline is not None:
+        remaining = min(remaining, deadline - time.monotonic())
+        if remaining <= 0:
+            raise SourceSearchError(source, 'timeout', "Prazo da busca esgotado antes de começar")
+    return RetryBudget(source, remaining)
+
+def _check_source_outcome(source, budget, articles):
+    if budget.failure and not articles:
+        raise SourceSearchError(source, budget.failure, f"Conector terminou com {budget.failure}")
+
+def run_source_search(source, query, min_year, min_citations, deadline=None, max_results=DEFAULT_RESULTS_PER_SOURCE):
+    """Executa a busca de uma fonte de forma síncrona.
+
+    `deadline` (time.monotonic) é o prazo da busca inteira; o conector recebe
+    só o tempo que resta até ele.
+    """
+    connector_function, args = _connector_call(source, query, min_year, min_citations, max_results)
+    key = response_cache_key(source, args)
+    cached = response_cache_get(source, key)
+    if cached is not None:
+        return cached
+
+    if not get_circuit_breaker(source).allow_search():
+        raise CircuitOpenError(f"Circuito de {source} aberto; fonte pulada")
+
+    budget = _source_budget(source, deadline)
+    articles = connector_function(*args, budget=budget)
+    _check_source_outcome(source, budget, articles)
+    # Resultado incompleto (página pulada, prazo esgotado) não vai para o cache
+    if not budget.failure:
+        response_cache_put(source, key, articles)
+    return articles
+
+async def run_source_search_async(source, query, min_year, min_citations, deadline=None,
+                                  max_results=DEFAULT_RESULTS_PER_SOURCE):
+    """Executa a busca de uma fonte como corrotina"""
+    connector_function, args = _connector_call(source, query, min_year, min_citations, max_results)
+    key = response_cache_key(source, args)
+    cached = await asyncio.to_thread(response_cache_get, source, key)
+    if cached is not None:
+        return cached
+
+    if not get_circuit_breaker(source).allow_search():
+        raise CircuitOpenError(f"Circuito de {source} aberto; fonte pulada")
+
+    budget = _source_budget(source, deadline)
+    articles = await connector_function.run_async(*args, budget=budget)
+    _check_source_outcome(source, budget, articles)
+    if not budget.failure:
+        await asyncio.to_thread(response_cache_put, source, key, articles)
+    return articles
+
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix='busca')
+_source_running = defaultdict(int)
+_source_pending = defaultdict(deque)
+_source_lock = threading.Lock()
+
+def submit_source_search(source, *args):
+    """Agenda uma busca respeitando o limite de concorrência da fonte"""
+    future = Future()
+    limit = SOURCE_CONCURRENCY.get(source, 2)
+
+    with _source_lock:
+        if _source_running[source] < limit:
+            _source_running[source] += 1
+            start_now = True
+        else:
+            _source_pending[source].append((future, args))
+            start_now = False
+
+    if start_now:
+        _start_source_search(source, future, args)
+    return future
+
+def _start_source_search(source, future, args):
+    if not future.set_running_or_notify_cancel():
+        _release_source_slot(source)
+        return
+
+    def _on_done(inner):
+        try:
+            future.set_result(inner.result())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            _release_source_slot(source)
+
+    _search_executor.submit(run_source_search, source, *args).add_done_callback(_on_done)
+
+def _release_source_slot(source):
+    with _source_lock:
+        if _source_pending[source]:
+            next_task = _source_pending[source].popleft()
+        else:
+            _source_running[source] -= 1
+            next_task = None
+
+    if next_task:
+        _start_source_search(source, *next_task)
+
+def _collect_search_results(future_to_task, timeout, report):
+    """Consome os futures conforme terminam, sem perder o que já chegou"""
+    try:
+        for future in as_completed(future_to_task, timeout=timeout):
+            task = future_to_task[future]
             try:
-                results = future.result(timeout=30)
-                log_info(f"{source.title()}: {len(results)} artigos coletados")
-                all_articles.extend(results)
+                results = future.result()
             except Exception as e:
-                log_error(f"Falha na busca em {source}", e)
-    
+                report.record_error(task[0], e)
+                continue
+            report.record(task[0], 'ok', len(results))
+            yield task, results
+    except FuturesTimeoutError:
+        pending = [task[0] for future, task in future_to_task.items() if not future.done()]
+        log_error(f"Tempo esgotado aguardando: {', '.join(pending)}")
+        for source in pending:
+            report.record(source, 'timeout')
+        for future in future_to_task:
+            future.cancel()
+
+_async_source_semaphores = {}
+
+def _get_async_semaphore(source):
+    # Criado sob demanda dentro do event loop para valer entre buscas simultâneas
+    semaphore = _async_source_semaphores.get(source)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(SOURCE_CONCURRENCY.get(source, 2))
+        _async_source_semaphores[source] = semaphore
+    return semaphore
+
+async def _run_search_tasks_async(tasks, min_year, min_citations, deadline, max_results, results_queue):
+    """Dispara todas as tarefas no event loop e publica cada resultado na fila"""
+    async def run_task(task):
+        source, strategy, query = task
+        async with _get_async_semaphore(source):
+            return await run_source_search_async(source, query, min_year, min_citations, deadline, max_results)
+
+    pending = {asyncio.ensure_future(run_task(task)): task for task in tasks}
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                task = pending.pop(finished)
+                try:
+                    results_queue.put((task, finished.result(), None))
+                except Exception as e:
+                    results_queue.put((task, None, e))
+    finally:
+        for unfinished in pending:
+            unfinished.cancel()
+        results_queue.put(None)
+
+def _iter_search_results_async(tasks, min_year, min_citations, deadline, max_results, report):
+    results_queue = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        _run_search_tasks_async(tasks, min_year, min_citations, deadline, max_results, results_queue),
+        get_async_loop()
+    )
+    pending = defaultdict(int)
+    for task in tasks:
+        pending[task[0]] += 1
+    collect_until = deadline + SEARCH_DEADLINE_GRACE
+    while True:
+        try:
+            item = results_queue.get(timeout=max(0, collect_until - time.monotonic()))
+        except queue.Empty:
+            log_error("Tempo esgotado aguardando as buscas assíncronas")
+            for source, count in pending.items():
+                for _ in range(count):
+                    report.record(source, 'timeout')
+            future.cancel()
+            return
+        if item is None:
+            return
+        task, results, error = item
+        pending[task[0]] -= 1
+        if error is not None:
+            report.record_error(task[0], error)
+            continue
+        report.record(task[0], 'ok', len(results))
+        yield task, results
+
+def iter_search_results(tasks, min_year, min_citations, timeout=SEARCH_TIMEOUT, report=None,
+                        max_results=DEFAULT_RESULTS_PER_SOURCE):
+    """Executa as tarefas (fonte, estratégia, query) no motor configurado.
+
+    Gera (tarefa, artigos) à medida que cada fonte termina. Todas as fontes
+    compartilham o prazo `timeout`; o status de cada uma vai para `report`.
+    `max_results` é o orçamento de registros de cada tarefa (paginação).
+    """
+    report = report if report is not None else SearchReport()
+    deadline = time.monotonic() + timeout
+    if SEARCH_ENGINE == 'async':
+        yield from _iter_search_results_async(tasks, min_year, min_citations, deadline, max_results, report)
+        return
+
+    future_to_task = {}
+    for task in tasks:
+        source, strategy, query = task
+        future = submit_source_search(source, query, min_year, min_citations, deadline, max_results)
+        future_to_task[future] = task
+    yield from _collect_search_results(future_to_task, timeout + SEARCH_DEADLINE_GRACE, report)
+
+def build_search_tasks(strategies, selected_sources=None):
+    """Lista todas as combinações (fonte, estratégia, query) a executar"""
+    if selected_sources is None:
+        selected_sources = DEFAULT_SOURCES
+
+    tasks = []
+    for strategy in strategies:
+        query = strategy.get('query', '').strip()
+        if not query:
+            continue
+        for source in selected_sources:
+            if source in SOURCE_CONNECTORS:
+                tasks.append((source, strategy, query))
+    return tasks
+
+def tag_strategy_articles(articles, strategy):
+    for article in articles:
+        article['topic'] = strategy.get('rationale', 'Busca')
+        article['search_strategy'] = strategy.get('topic', 'Geral')
+
+def search_all_sources(query, min_year, min_citations, selected_sources=None, timeout=SEARCH_TIMEOUT, report=None,
+                       max_results=DEFAULT_RESULTS_PER_SOURCE):
+    """Busca em todas as fontes acadêmicas disponíveis"""
+    return search_strategies(
+        [{'query': query}], min_year, min_citations, selected_sources, tag=False, timeout=timeout, report=report,
+        max_results=max_results
+    )
+
+def search_strategies(strategies, min_year, min_citations, selected_sources=None, tag=True,
+                      timeout=SEARCH_TIMEOUT, report=None, max_results=DEFAULT_RESULTS_PER_SOURCE):
+    """Executa todas as combinações (estratégia, fonte) de uma só vez"""
+    tasks = build_search_tasks(strategies, selected_sources)
+    log_info(f"Disparadas {len(tasks)} buscas ({len(strategies)} estratégias, motor: {SEARCH_ENGINE}, "
+             f"prazo: {timeout:.1f}s, até {max_results} registros por fonte)")
+
+    all_articles = []
+    for (source, strategy, query), results in iter_search_results(tasks, min_year, min_citations, timeout, report,
+                                                                  max_results):
+        log_info(f"{source.title()}: {len(results)} artigos coletados")
+        if tag:
+            tag_strategy_articles(results, strategy)
+        all_articles.extend(results)
+
     return all_articles
 
 # --- FUNÇÕES AUXILIARES ---
 
-def get_drive_service():
-    """Configuração robusta do serviço do Google Drive"""
+def _load_drive_credentials():
+    """Carrega (e renova, se preciso) as credenciais do Google Drive"""
     creds = None
     
     try:
@@ -874,14 +2479,75 @@ def get_drive_service():
                 else:
                     raise Exception("Token inválido em produção.")
         
-        service = build('drive', 'v3', credentials=creds)
-        log_info("Serviço do Google Drive configurado")
-        return service
+        return creds
         
     except Exception as e:
         log_error("Erro na configuração do Google Drive", e)
         raise
 
+# O serviço do Drive é reaproveitado entre requisições: as credenciais e o ID
+# da pasta são compartilhados pelo processo, e cada thread mantém o seu próprio
+# serviço (o transporte httplib2 não é thread-safe). Tudo é descartado só em
+# erros de autenticação.
+DRIVE_TOKEN_REFRESH_MARGIN = int(os.environ.get('DRIVE_TOKEN_REFRESH_MARGIN', 300))
+
+_drive_credentials = None
+_drive_generation = 0
+_drive_folder_ids = {}
+_drive_lock = threading.RLock()
+_drive_local = threading.local()
+
+def _get_drive_credentials():
+    global _drive_credentials
+    with _drive_lock:
+        if _drive_credentials is None:
+            _drive_credentials = _load_drive_credentials()
+        
+        creds = _drive_credentials
+        # Renova antes de expirar para nenhuma requisição pagar pela renovação
+        if creds.expiry and creds.refresh_token:
+            remaining = (creds.expiry - datetime.datetime.utcnow()).total_seconds()
+            if remaining < DRIVE_TOKEN_REFRESH_MARGIN:
+                try:
+                    creds.refresh(Request())
+                    log_info("Token do Google Drive renovado antecipadamente")
+                except Exception as e:
+                    log_error("Falha ao renovar token do Google Drive", e)
+                    invalidate_drive_client()
+                    raise
+        return creds
+
+def get_drive_service():
+    """Serviço do Google Drive reaproveitado (um por thread)"""
+    creds = _get_drive_credentials()
+    service = getattr(_drive_local, 'service', None)
+    if service is None or _drive_local.generation != _drive_generation:
+        service = build('drive', 'v3', credentials=creds, cache_discovery=False)
+        _drive_local.service = service
+        _drive_local.generation = _drive_generation
+        log_info("Serviço do Google Drive configurado")
+    return service
+
+def invalidate_drive_client():
+    """Descarta credenciais, serviços e pastas em cache"""
+    global _drive_credentials, _drive_generation
+    with _drive_lock:
+        _drive_credentials = None
+        _drive_generation += 1
+        _drive_folder_ids.clear()
+    log_info("Cliente do Google Drive invalidado")
+
+def handle_drive_error(exception):
+    """Invalida o cache do Drive quando o erro indica credencial ou pasta inválida"""
+    if isinstance(exception, RefreshError):
+        invalidate_drive_client()
+    elif isinstance(exception, HttpError):
+        if exception.resp.status == 401:
+            invalidate_drive_client()
+        elif exception.resp.status == 404:
+            with _drive_lock:
+                _drive_folder_ids.clear()
+
 def get_ai_search_strategies(research_question, api_key):
     """Gera estratégias de busca usando IA"""
     if not api_key:
@@ -909,6 +2575,7 @@ def get_ai_search_strategies(research_question, api_key):
         ]
         """
         
+        wait_for_rate_limit('gemini')
         response = model.generate_content(prompt)
         cleaned_response = response.text.strip().replace('```json', '').replace('```', '')
         
@@ -927,83 +2594,478 @@ def get_ai_search_strategies(research_question, api_key):
         log_error("Erro geral na geração de estratégias", e)
         return [{'query': research_question, 'rationale': 'Falha na IA.', 'topic': 'Busca Direta'}]
 
+# Cache de resumos endereçado pelo conteúdo: hash do resumo original + versão
+# do prompt + modelo. Mudar o prompt ou o modelo invalida as entradas antigas.
+# Fica num SQLite próprio, independente do cache de respostas das fontes.
+SUMMARY_MODEL = os.environ.get('GEMINI_SUMMARY_MODEL', 'gemini-1.5-flash')
+SUMMARY_PROMPT_VERSION = 1
+SUMMARY_CACHE_ENABLED = os.environ.get('SUMMARY_CACHE_ENABLED', '1') != '0'
+SUMMARY_CACHE_DB = os.environ.get('SUMMARY_CACHE_DB', 'summary_cache.sqlite3')
+SUMMARY_CACHE_MAX_ITEMS = int(os.environ.get('SUMMARY_CACHE_MAX_ITEMS', 50000))
+
+SUMMARY_PROMPT = """
+        Analise o resumo abaixo e escreva um parágrafo em português (100-150 palavras) destacando:
+        1. Problema/Objetivo da pesquisa
+        2. Metodologia utilizada
+        3. Principais conclusões
+        
+        Resumo para análise:
+        ---
+        {abstract}
+        ---
+        
+        Responda apenas com o parágrafo analítico, sem formatação adicional.
+        """
+
+SUMMARY_ERROR_MESSAGE = "Ocorreu um erro ao tentar gerar o resumo analítico."
+
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+_summary_cache_stats = defaultdict(int)
+
+def _get_summary_cache():
+    global _summary_cache
+    if _summary_cache is None:
+        connection = sqlite3.connect(SUMMARY_CACHE_DB, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS summaries ('
+            'key TEXT PRIMARY KEY, summary TEXT, created_at REAL, last_used REAL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used)')
+        connection.commit()
+        _summary_cache = connection
+    return _summary_cache
+
+def summary_cache_key(abstract, model=SUMMARY_MODEL):
+    normalized = ' '.join(abstract.split())
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return f"{digest}:{SUMMARY_PROMPT_VERSION}:{model}"
+
+def summary_cache_get(key):
+    """Resumo em cache ou None; cada acerto renova a posição na fila de despejo"""
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    try:
+        with _summary_cache_lock:
+            connection = _get_summary_cache()
+            row = connection.execute('SELECT summary FROM summaries WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE summaries SET last_used = ? WHERE key = ?', (time.time(), key))
+                connection.commit()
+    except sqlite3.Error as e:
+        log_error("Erro ao ler o cache de resumos", e)
+        row = None
+    
+    _summary_cache_stats['hits' if row is not None else 'misses'] += 1
+    return row[0] if row is not None else None
+
+def summary_cache_put(key, summary):
+    """Guarda um resumo, despejando os menos usados acima do limite"""
+    if not SUMMARY_CACHE_ENABLED:
+        return
+    now = time.time()
+    try:
+        with _summary_cache_lock:
+            connection = _get_summary_cache()
+            connection.execute(
+                'INSERT OR REPLACE INTO summaries (key, summary, created_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, summary, now, now)
+            )
+            evicted = connection.execute(
+                'DELETE FROM summaries WHERE key IN ('
+                'SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (SUMMARY_CACHE_MAX_ITEMS,)
+            ).rowcount
+            connection.commit()
+        _summary_cache_stats['evictions'] += max(0, evicted)
+    except sqlite3.Error as e:
+        log_error("Erro ao gravar no cache de resumos", e)
+
+def get_summary_cache_stats():
+    stats = dict(_summary_cache_stats)
+    stats['enabled'] = SUMMARY_CACHE_ENABLED
+    try:
+        with _summary_cache_lock:
+            stats['items'] = _get_summary_cache().execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+    except sqlite3.Error as e:
+        stats['error'] = str(e)
+    stats['model'] = SUMMARY_MODEL
+    stats['prompt_version'] = SUMMARY_PROMPT_VERSION
+    return stats
+
 def get_ai_summary(abstract, api_key):
     """Gera resumo analítico usando IA"""
     if not abstract or "resumo não disponível" in abstract.lower():
         return "Não foi possível gerar o resumo."
     
+    cache_key = summary_cache_key(abstract)
+    cached = summary_cache_get(cache_key)
+    if cached is not None:
+        log_info("Resumo analítico obtido do cache")
+        return cached
+    
     if not api_key:
         return "API key do Gemini não disponível."
     
     try:
         log_info("Gerando resumo analítico...")
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = genai.GenerativeModel(SUMMARY_MODEL)
         
-        prompt = f"""
-        Analise o resumo abaixo e escreva um parágrafo em português (100-150 palavras) destacando:
+        wait_for_rate_limit('gemini')
+        response = model.generate_content(SUMMARY_PROMPT.format(abstract=abstract))
+        summary = response.text.strip()
+        if summary:
+            summary_cache_put(cache_key, summary)
+        return summary
+        
+    except Exception as e:
+        log_error("Erro ao gerar resumo analítico", e)
+        return SUMMARY_ERROR_MESSAGE
+
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.environ.get('SUMMARY_BATCH_TOKEN_BUDGET', 8000))
+SUMMARY_BATCH_MAX_ITEMS = int(os.environ.get('SUMMARY_BATCH_MAX_ITEMS', 10))
+SUMMARY_BATCH_WORKERS = int(os.environ.get('SUMMARY_BATCH_WORKERS', 3))
+# Espera máxima por lote, contando os itens refeitos individualmente
+SUMMARY_BATCH_TIMEOUT = int(os.environ.get('SUMMARY_BATCH_TIMEOUT', 60))
+
+SUMMARY_BATCH_PROMPT = """
+        Para cada resumo no JSON abaixo (chave = id do artigo), escreva um parágrafo em português (100-150 palavras) destacando:
         1. Problema/Objetivo da pesquisa
         2. Metodologia utilizada
         3. Principais conclusões
         
-        Resumo para análise:
-        ---
-        {abstract}
-        ---
+        Resumos para análise:
+        {abstracts}
         
-        Responda apenas com o parágrafo analítico, sem formatação adicional.
+        Retorne **APENAS** um JSON válido: um objeto com os mesmos ids como chaves e o parágrafo analítico de cada artigo como valor, sem formatação adicional.
         """
+
+def estimate_tokens(text):
+    """Estimativa grosseira (~4 caracteres por token), suficiente para montar lotes"""
+    return len(text) // 4 + 1
+
+def build_summary_batches(items):
+    """Agrupa (id, resumo) em lotes que respeitam o orçamento de tokens"""
+    overhead = estimate_tokens(SUMMARY_BATCH_PROMPT)
+    batches, current, used = [], [], overhead
+    for article_id, abstract in items:
+        cost = estimate_tokens(abstract) + estimate_tokens(article_id) + 4
+        if current and (used + cost > SUMMARY_BATCH_TOKEN_BUDGET or len(current) >= SUMMARY_BATCH_MAX_ITEMS):
+            batches.append(current)
+            current, used = [], overhead
+        current.append((article_id, abstract))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _summarize_batch(batch, api_key):
+    """Resume um lote numa única chamada; itens que falharem saem em chamadas individuais"""
+    if len(batch) == 1:
+        article_id, abstract = batch[0]
+        return {article_id: get_ai_summary(abstract, api_key)}
+    
+    summaries = {}
+    try:
+        log_info(f"Gerando {len(batch)} resumos analíticos em lote...")
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(SUMMARY_MODEL)
         
-        response = model.generate_content(prompt)
-        time.sleep(1)
-        return response.text.strip()
+        abstracts = json.dumps(dict(batch), ensure_ascii=False, indent=2)
+        wait_for_rate_limit('gemini')
+        response = model.generate_content(SUMMARY_BATCH_PROMPT.format(abstracts=abstracts))
+        cleaned_response = response.text.strip().replace('```json', '').replace('```', '')
+        decoded_data = json.loads(cleaned_response)
         
+        if isinstance(decoded_data, dict):
+            for article_id, abstract in batch:
+                summary = decoded_data.get(article_id)
+                if isinstance(summary, str) and summary.strip():
+                    summaries[article_id] = summary.strip()
+                    summary_cache_put(summary_cache_key(abstract), summaries[article_id])
+        else:
+            log_error("Resposta da IA para o lote não é um objeto JSON")
+    except json.JSONDecodeError as e:
+        log_error("Erro ao decodificar resposta da IA para o lote", e)
     except Exception as e:
-        log_error("Erro ao gerar resumo analítico", e)
-        return "Ocorreu um erro ao tentar gerar o resumo analítico."
+        log_error("Erro ao gerar resumos analíticos em lote", e)
+    
+    missing = [(article_id, abstract) for article_id, abstract in batch if article_id not in summaries]
+    if missing:
+        log_info(f"{len(missing)} resumo(s) do lote refeito(s) individualmente")
+    for article_id, abstract in missing:
+        summaries[article_id] = get_ai_summary(abstract, api_key)
+    return summaries
+
+def get_ai_summaries(abstracts, api_key):
+    """Gera resumos analíticos para {id: resumo original}, agrupando em lotes.
+
+    Resumos já em cache e entradas sem resumo não vão para o modelo; resumos
+    originais repetidos são enviados uma única vez.
+    """
+    summaries = {}
+    pending = OrderedDict()
+    for article_id, abstract in abstracts.items():
+        if not abstract or "resumo não disponível" in abstract.lower() or not api_key:
+            summaries[article_id] = get_ai_summary(abstract, api_key)
+            continue
+        cached = summary_cache_get(summary_cache_key(abstract))
+        if cached is not None:
+            summaries[article_id] = cached
+        else:
+            pending.setdefault(summary_cache_key(abstract), []).append((article_id, abstract))
+    
+    if pending:
+        batches = build_summary_batches([ids[0] for ids in pending.values()])
+        log_info(f"{len(pending)} resumo(s) a gerar em {len(batches)} chamada(s) ao modelo")
+        # Sem o with: um lote travado não pode segurar a resposta no shutdown
+        executor = ThreadPoolExecutor(max_workers=SUMMARY_BATCH_WORKERS)
+        futures = [executor.submit(_summarize_batch, batch, api_key) for batch in batches]
+        try:
+            for batch, future in zip(batches, futures):
+                try:
+                    summaries.update(future.result(timeout=SUMMARY_BATCH_TIMEOUT))
+                except FuturesTimeoutError:
+                    log_error(f"Tempo esgotado gerando lote de {len(batch)} resumo(s)")
+                    summaries.update((article_id, SUMMARY_ERROR_MESSAGE) for article_id, _ in batch)
+                except Exception as e:
+                    log_error("Erro ao gerar resumos analíticos em lote", e)
+                    summaries.update((article_id, SUMMARY_ERROR_MESSAGE) for article_id, _ in batch)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        for duplicates in pending.values():
+            for article_id, _ in duplicates[1:]:
+                summaries[article_id] = summaries[duplicates[0][0]]
+    
+    return summaries
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s"<>]+', re.IGNORECASE)
+ARXIV_URL_PATTERN = re.compile(r'arxiv\.org/(?:abs|pdf)/([\w./-]+?)(?:v\d+)?(?:\.pdf)?$', re.IGNORECASE)
+PUBMED_URL_PATTERN = re.compile(r'pubmed\.ncbi\.nlm\.nih\.gov/(\d+)')
+TITLE_SHINGLE_SIZE = 3
+MIN_CONTAINMENT_TITLE_LENGTH = 20
 
-def deduplicate_articles(articles, saved_articles_ids=None):
-    """Remove artigos duplicados de múltiplas fontes"""
-    if saved_articles_ids is None:
-        saved_articles_ids = set()
+def normalize_title(title):
+    """Título sem acentos, pontuação e caixa, como lista de palavras"""
+    if not title:
+        return []
+    text = unicodedata.normalize('NFKD', title)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^\w\s]', ' ', text).split()
+
+def extract_doi(article):
+    """Extrai o DOI normalizado do campo doi, da URL ou do ID do artigo"""
+    for value in (article.get('doi'), article.get('url'), article.get('id')):
+        if not value or not isinstance(value, str):
+            continue
+        match = DOI_PATTERN.search(value)
+        if match:
+            return match.group(0).rstrip('.,;)').lower()
+    return None
+
+def extract_identifiers(article):
+    """Identificadores persistentes do artigo (DOI, arXiv, PMID) como chaves"""
+    identifiers = set()
     
-    seen_titles = set()
-    seen_urls = set()
-    seen_ids = set()
-    unique_articles = []
+    doi = extract_doi(article)
+    if doi:
+        identifiers.add(f"doi:{doi}")
     
-    for article in articles:
-        if article.get('id') in saved_articles_ids:
-            continue
-        
-        title = article.get('title', '').lower().strip()
-        url = article.get('url', '').strip()
-        article_id = article.get('id', '').strip()
-        
-        is_duplicate = False
-        for seen_title in seen_titles:
-            if title and seen_title and (
-                title == seen_title or 
-                (len(title) > 20 and len(seen_title) > 20 and title in seen_title) or
-                (len(title) > 20 and len(seen_title) > 20 and seen_title in title)
-            ):
-                is_duplicate = True
-                break
-        
-        if not is_duplicate and (
-            (url and url in seen_urls) or 
-            (article_id and article_id in seen_ids)
-        ):
-            is_duplicate = True
-        
-        if not is_duplicate and title and url:
-            unique_articles.append(article)
-            seen_titles.add(title)
-            if url:
-                seen_urls.add(url)
-            if article_id:
-                seen_ids.add(article_id)
+    arxiv_id = article.get('arxiv_id')
+    if not arxiv_id:
+        match = ARXIV_URL_PATTERN.search(article.get('url') or '')
+        arxiv_id = match.group(1) if match else None
+    if arxiv_id:
+        arxiv_id = re.sub(r'v\d+$', '', str(arxiv_id)).lower()
+        identifiers.add(f"arxiv:{arxiv_id}")
+    
+    pmid = article.get('pmid')
+    if not pmid:
+        match = PUBMED_URL_PATTERN.search(article.get('url') or '')
+        pmid = match.group(1) if match else None
+    if pmid:
+        identifiers.add(f"pmid:{pmid}")
+    
+    return identifiers
+
+def normalize_url(url):
+    url = (url or '').strip().lower()
+    url = re.sub(r'^https?://(www\.)?', '', url)
+    return url.rstrip('/')
+
+def _has_abstract(text):
+    return bool(text) and 'não disponível' not in text.lower() and 'não encontrado' not in text.lower()
+
+def merge_article_records(target, other):
+    """Completa o registro canônico com os dados de outra fonte"""
+    if _has_abstract(other.get('abstract')) and (
+        not _has_abstract(target.get('abstract'))
+        or len(other['abstract']) > len(target['abstract'])
+    ):
+        target['abstract'] = other['abstract']
     
+    target['citations'] = max(target.get('citations') or 0, other.get('citations') or 0)
+    
+    if len(other.get('authors') or []) > len(target.get('authors') or []):
+        target['authors'] = other['authors']
+    
+    if target.get('venue') in (None, '', 'N/A') and other.get('venue') not in (None, '', 'N/A'):
+        target['venue'] = other['venue']
+    
+    if not target.get('year') and other.get('year'):
+        target['year'] = other['year']
+    
+    for field in ('doi', 'pmid', 'arxiv_id'):
+        if not target.get(field) and other.get(field):
+            target[field] = other[field]
+    
+    urls = target.get('urls') or [target.get('url')]
+    for url in other.get('urls') or [other.get('url')]:
+        if url and url not in urls:
+            urls.append(url)
+    target['urls'] = [url for url in urls if url]
+    
+    sources = target.get('merged_sources') or [target.get('source')]
+    if other.get('source') and other['source'] not in sources:
+        sources.append(other['source'])
+    target['merged_sources'] = sources
+
+class DuplicateIndex:
+    """Índice incremental de artigos já aceitos.
+
+    Artigos com o mesmo DOI, arXiv ID ou PMID são fundidos no registro
+    canônico (o primeiro a chegar) em vez de descartados. Os demais
+    critérios só descartam: mesma URL ou ID, mesmo título normalizado, ou
+    um título (> 20 caracteres) contido no outro. A contenção é verificada
+    por um índice de shingles de palavras (título novo dentro de um aceito) e
+    pelos trechos contíguos do título novo (aceito dentro do novo), então o
+    custo por artigo não cresce com o tamanho do índice.
+    """
+
+    def __init__(self, saved_ids=None, merge=True):
+        self.saved_ids = set(saved_ids or ())
+        self.merge = merge
+        self.records_by_identifier = {}
+        self.urls = set()
+        self.ids = set()
+        self.titles = set()
+        self.long_titles = []
+        self.shingle_index = defaultdict(list)
+        self.max_long_title_words = 0
+        self.merged_count = 0
+
+    @staticmethod
+    def _shingles(words, size=TITLE_SHINGLE_SIZE):
+        size = min(size, len(words))
+        return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+    def _contains_similar_title(self, words):
+        padded = f" {' '.join(words)} "
+
+        # Títulos já aceitos que contêm o novo compartilham todos os seus
+        # shingles, então basta olhar a lista do shingle mais raro. Títulos
+        # com menos palavras que o shingle (raros) são comparados um a um.
+        if len(words) >= TITLE_SHINGLE_SIZE:
+            shingles = self._shingles(words)
+            rarest = min(shingles, key=lambda sh: len(self.shingle_index.get(sh, ())))
+            candidates = self.shingle_index.get(rarest, ())
+        else:
+            candidates = range(len(self.long_titles))
+        for position in candidates:
+            if padded in f" {self.long_titles[position]} ":
+                return True
+
+        # Títulos já aceitos contidos no novo são trechos contíguos de palavras
+        # dele: cada trecho longo o bastante é procurado em self.titles
+        for start in range(len(words)):
+            span = words[start]
+            for end in range(start + 1, min(len(words), start + self.max_long_title_words) + 1):
+                if end > start + 1:
+                    span = f"{span} {words[end - 1]}"
+                if len(span) > MIN_CONTAINMENT_TITLE_LENGTH and span in self.titles:
+                    return True
+        return False
+
+    def find_record(self, identifiers):
+        for identifier in identifiers:
+            record = self.records_by_identifier.get(identifier)
+            if record is not None:
+                return record
+        return None
+
+    def is_duplicate(self, article, identifiers=None):
+        if article.get('id') in self.saved_ids:
+            return True
+
+        if identifiers is None:
+            identifiers = extract_identifiers(article)
+        if self.find_record(identifiers) is not None:
+            return True
+
+        title = ' '.join(normalize_title(article.get('title', '')))
+        if title and title in self.titles:
+            return True
+
+        url = normalize_url(article.get('url', ''))
+        article_id = (article.get('id') or '').strip()
+        if (url and url in self.urls) or (article_id and article_id in self.ids):
+            return True
+
+        if len(title) > MIN_CONTAINMENT_TITLE_LENGTH and self.long_titles:
+            return self._contains_similar_title(title.split())
+        return False
+
+    def add(self, article):
+        """Registra o artigo se não for duplicado. Retorna True se foi aceito.
+
+        Duplicatas por identificador são fundidas no registro já aceito.
+        """
+        if not (article.get('title') or '').strip() or not (article.get('url') or '').strip():
+            return False
+        if article.get('id') in self.saved_ids:
+            return False
+
+        identifiers = extract_identifiers(article)
+        record = self.find_record(identifiers)
+        if record is not None:
+            if self.merge:
+                merge_article_records(record, article)
+                self.merged_count += 1
+                for identifier in identifiers:
+                    self.records_by_identifier.setdefault(identifier, record)
+            return False
+
+        if self.is_duplicate(article, identifiers):
+            return False
+
+        words = normalize_title(article.get('title', ''))
+        title = ' '.join(words)
+        if title:
+            self.titles.add(title)
+        if len(title) > MIN_CONTAINMENT_TITLE_LENGTH:
+            position = len(self.long_titles)
+            self.long_titles.append(title)
+            for shingle in set(self._shingles(words)):
+                self.shingle_index[shingle].append(position)
+            self.max_long_title_words = max(self.max_long_title_words, len(words))
+
+        for identifier in identifiers:
+            self.records_by_identifier[identifier] = article
+        self.urls.add(normalize_url(article.get('url', '')))
+        article_id = (article.get('id') or '').strip()
+        if article_id:
+            self.ids.add(article_id)
+        return True
+
+def deduplicate_articles(articles, saved_articles_ids=None):
+    """Remove artigos duplicados de múltiplas fontes, fundindo os que têm o mesmo DOI/arXiv/PMID"""
+    index = DuplicateIndex(saved_articles_ids)
+    unique_articles = [article for article in articles if index.add(article)]
+    if index.merged_count:
+        log_info(f"{index.merged_count} registros fundidos por DOI/arXiv/PMID")
     return unique_articles
 
 def sanitize_filename(text):
@@ -1012,6 +3074,10 @@ def sanitize_filename(text):
     return re.sub(r'[\\/*?:"<>|]', "", text).strip()
 
 def get_or_create_folder(service, folder_name):
+    folder_id = _drive_folder_ids.get(folder_name)
+    if folder_id:
+        return folder_id
+    
     try:
         query = f"mimeType='application/vnd.google-apps.folder' and name='{folder_name}' and trashed=false"
         response = service.files().list(q=query, fields='files(id)').execute()
@@ -1019,7 +3085,7 @@ def get_or_create_folder(service, folder_name):
         files = response.get('files', [])
         if files:
             log_info(f"Pasta '{folder_name}' encontrada")
-            return files[0].get('id')
+            folder_id = files[0].get('id')
         else:
             log_info(f"Criando pasta '{folder_name}'")
             file_metadata = {
@@ -1027,27 +3093,16 @@ def get_or_create_folder(service, folder_name):
                 'mimeType': 'application/vnd.google-apps.folder'
             }
             folder = service.files().create(body=file_metadata, fields='id').execute()
-            return folder.get('id')
+            folder_id = folder.get('id')
+        
+        with _drive_lock:
+            _drive_folder_ids[folder_name] = folder_id
+        return folder_id
     except Exception as e:
+        handle_drive_error(e)
         log_error(f"Erro ao obter/criar pasta '{folder_name}'", e)
         raise
 
-def download_file_content(service, folder_id, filename):
-    try:
-        query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
-        response = service.files().list(q=query, fields='files(id)').execute()
-        
-        files = response.get('files', [])
-        if files:
-            request = service.files().get_media(fileId=files[0]['id'])
-            content = io.BytesIO(request.execute()).read().decode('utf-8')
-            log_info(f"Arquivo '{filename}' baixado")
-            return content
-        return None
-    except Exception as e:
-        log_error(f"Erro ao baixar arquivo '{filename}'", e)
-        return None
-
 def upload_text_file(service, folder_id, filename, content):
     try:
         file_metadata = {'name': filename, 'parents': [folder_id]}
@@ -1065,25 +3120,79 @@ def upload_text_file(service, folder_id, filename, content):
             service.files().create(body=file_metadata, media_body=media_body).execute()
             log_info(f"Arquivo '{filename}' criado")
     except Exception as e:
+        handle_drive_error(e)
         log_error(f"Erro ao fazer upload do arquivo '{filename}'", e)
         raise
 
-def load_saved_articles_from_drive(service, folder_id):
+DRIVE_UPLOAD_WORKERS = int(os.environ.get('DRIVE_UPLOAD_WORKERS', 6))
+
+# Pool fixo: cada thread guarda o seu serviço do Drive (get_drive_service)
+# entre uma requisição e outra
+_drive_upload_executor = ThreadPoolExecutor(max_workers=DRIVE_UPLOAD_WORKERS, thread_name_prefix='drive-upload')
+
+def list_folder_files(service, folder_id):
+    """Mapeia nome -> ID de todos os arquivos da pasta (uma listagem paginada)"""
+    files = {}
+    page_token = None
+    while True:
+        response = service.files().list(
+            q=f"'{folder_id}' in parents and trashed=false",
+            fields='nextPageToken, files(id,name)',
+            pageSize=1000,
+            pageToken=page_token
+        ).execute()
+        for item in response.get('files', []):
+            files.setdefault(item['name'], item['id'])
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return files
+
+def upload_text_files(service, folder_id, files):
+    """Envia vários arquivos de texto em paralelo.
+
+    Os IDs existentes vêm de uma única listagem da pasta, e cada arquivo é
+    criado/atualizado com um upload multipart (uma requisição só). A API de
+    batch do Drive não aceita upload de conteúdo, por isso o paralelismo.
+    Retorna o conjunto de nomes enviados com sucesso.
+    """
+    if not files:
+        return set()
+    
     try:
-        content = download_file_content(service, folder_id, SAVED_ARTICLES_FILENAME)
-        if not content:
-            log_info("Nenhum arquivo de artigos salvos encontrado")
-            return []
-        
-        articles = json.loads(content)
-        log_info(f"Carregados {len(articles)} artigos salvos")
-        return articles
-    except json.JSONDecodeError as e:
-        log_error("Erro ao decodificar arquivo de artigos salvos", e)
-        return []
+        existing = list_folder_files(service, folder_id)
     except Exception as e:
-        log_error("Erro ao carregar artigos salvos", e)
-        return []
+        handle_drive_error(e)
+        log_error("Erro ao listar arquivos da pasta do Drive", e)
+        raise
+    
+    # Nomes repetidos no mesmo envio: vale o último conteúdo, como no envio em série
+    contents = dict(files)
+    
+    def upload_one(filename, content):
+        thread_service = get_drive_service()
+        media_body = MediaIoBaseUpload(io.BytesIO(content.encode('utf-8')), mimetype='text/plain', resumable=False)
+        if filename in existing:
+            thread_service.files().update(fileId=existing[filename], media_body=media_body).execute()
+        else:
+            thread_service.files().create(
+                body={'name': filename, 'parents': [folder_id]}, media_body=media_body, fields='id'
+            ).execute()
+    
+    uploaded = set()
+    future_to_name = {
+        _drive_upload_executor.submit(upload_one, name, content): name for name, content in contents.items()
+    }
+    for future in as_completed(future_to_name):
+        filename = future_to_name[future]
+        try:
+            future.result()
+            uploaded.add(filename)
+        except Exception as e:
+            handle_drive_error(e)
+            log_error(f"Erro ao fazer upload do arquivo '{filename}'", e)
+    
+    log_info(f"{len(uploaded)} de {len(contents)} arquivos enviados ao Drive")
+    return uploaded
 
 def save_articles_to_drive(service, folder_id, articles):
     try:
@@ -1094,6 +3203,411 @@ def save_articles_to_drive(service, folder_id, articles):
         log_error("Erro ao salvar artigos no Drive", e)
         raise
 
+# --- BIBLIOTECA LOCAL DE ARTIGOS SALVOS ---
+# Cópia de trabalho em SQLite (WAL) da biblioteca. As leituras são sempre
+# locais; uma thread em segundo plano envia as alterações ao Drive e traz
+# alterações remotas quando o estado no Drive muda.
+#
+# No Drive a biblioteca é o snapshot saved_articles.json mais segmentos de
+# log (saved_articles.changes.*.jsonl) com as operações feitas depois dele:
+# {"op": "upsert", "id", "data"}, {"op": "patch", "id", "fields"} e
+# {"op": "delete", "id"}. Cada sincronização cria só um segmento pequeno; de
+# tempos em tempos os segmentos são compactados num novo snapshot.
+
+LIBRARY_DB = os.environ.get('LIBRARY_DB', 'library.sqlite3')
+LIBRARY_SYNC_INTERVAL = int(os.environ.get('LIBRARY_SYNC_INTERVAL', 60))
+LIBRARY_PUSH_DELAY = float(os.environ.get('LIBRARY_PUSH_DELAY', 2))
+LIBRARY_COMPACT_SEGMENTS = int(os.environ.get('LIBRARY_COMPACT_SEGMENTS', 20))
+SAVED_ARTICLES_CHANGES_PREFIX = "saved_articles.changes."
+LIBRARY_READONLY_FIELDS = {'id', 'version'}
+
+_library_db = None
+_library_lock = threading.RLock()
+_library_sync_event = threading.Event()
+_library_sync_thread = None
+_library_push_lock = threading.Lock()
+
+def _get_library_db():
+    global _library_db
+    if _library_db is None:
+        connection = sqlite3.connect(LIBRARY_DB, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS articles ('
+            'id TEXT PRIMARY KEY, position INTEGER, data TEXT)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS idx_articles_position ON articles(position)')
+        connection.execute('CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        connection.commit()
+        _library_db = connection
+    return _library_db
+
+def _library_meta_get(key, default=None):
+    row = _get_library_db().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+def _library_meta_set(key, value):
+    _get_library_db().execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+def _library_write_rows(articles):
+    connection = _get_library_db()
+    connection.execute('DELETE FROM articles')
+    connection.executemany(
+        'INSERT OR REPLACE INTO articles (id, position, data) VALUES (?, ?, ?)',
+        [(article.get('id') or f"sem_id_{position}", position, json.dumps(article, ensure_ascii=False))
+         for position, article in enumerate(articles)]
+    )
+
+def _library_read_articles():
+    rows = _get_library_db().execute('SELECT data FROM articles ORDER BY position').fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+def _library_apply_op(op):
+    """Aplica uma operação do log às linhas locais"""
+    connection = _get_library_db()
+    if op['op'] == 'delete':
+        connection.execute('DELETE FROM articles WHERE id = ?', (op['id'],))
+        return
+    
+    row = connection.execute('SELECT data FROM articles WHERE id = ?', (op['id'],)).fetchone()
+    if op['op'] == 'patch':
+        if row is None:
+            return
+        article = json.loads(row[0])
+        article.update(op['fields'])
+    else:
+        article = op['data']
+    
+    data = json.dumps(article, ensure_ascii=False)
+    if row is not None:
+        connection.execute('UPDATE articles SET data = ? WHERE id = ?', (data, op['id']))
+    else:
+        position = connection.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM articles').fetchone()[0]
+        connection.execute('INSERT INTO articles (id, position, data) VALUES (?, ?, ?)', (op['id'], position, data))
+
+def _library_record_ops(ops):
+    """Aplica operações localmente e as enfileira para o Drive"""
+    if not ops:
+        return
+    connection = _get_library_db()
+    for op in ops:
+        _library_apply_op(op)
+    connection.executemany(
+        'INSERT INTO changes (op) VALUES (?)',
+        [(json.dumps(op, ensure_ascii=False),) for op in ops]
+    )
+
+def _library_pending_ops():
+    return _get_library_db().execute('SELECT seq, op FROM changes ORDER BY seq').fetchall()
+
+def _list_change_segments(service, folder_id):
+    """Segmentos de log no Drive, em ordem de criação"""
+    segments = []
+    page_token = None
+    while True:
+        response = service.files().list(
+            q=f"name contains '{SAVED_ARTICLES_CHANGES_PREFIX}' and '{folder_id}' in parents and trashed=false",
+            fields='nextPageToken, files(id,name)',
+            pageSize=1000,
+            pageToken=page_token
+        ).execute()
+        segments.extend(item for item in response.get('files', []) if item['name'].startswith(SAVED_ARTICLES_CHANGES_PREFIX))
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return sorted(segments, key=lambda item: item['name'])
+
+def _library_token(snapshot_version, segment_names):
+    return '|'.join([snapshot_version] + sorted(segment_names))
+
+def _remote_library_state(service, folder_id):
+    """Snapshot, segmentos e um token que muda a cada alteração remota"""
+    snapshot = get_drive_file_metadata(service, folder_id, SAVED_ARTICLES_FILENAME)
+    segments = _list_change_segments(service, folder_id)
+    snapshot_version = snapshot.get('version', '') if snapshot else ''
+    return snapshot, segments, _library_token(snapshot_version, [item['name'] for item in segments])
+
+def _library_applied_segments():
+    """Nomes dos segmentos do Drive já incorporados à cópia local"""
+    return set(json.loads(_library_meta_get('remote_segment_names', '[]')))
+
+def get_drive_file_metadata(service, folder_id, filename):
+    """Metadados (id, version) do arquivo no Drive, ou None se não existir"""
+    query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
+    response = service.files().list(q=query, fields='files(id,version,md5Checksum)').execute()
+    files = response.get('files', [])
+    return files[0] if files else None
+
+def library_pull_from_drive():
+    """Reconstrói a cópia local a partir do Drive (levanta exceção se falhar).
+
+    Operações locais ainda não enviadas são reaplicadas por cima.
+    """
+    service = get_drive_service()
+    folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
+    snapshot, segments, token = _remote_library_state(service, folder_id)
+    
+    articles = []
+    if snapshot:
+        content = service.files().get_media(fileId=snapshot['id']).execute()
+        articles = json.loads(content.decode('utf-8')) if content else []
+    
+    remote_ops = []
+    for segment in segments:
+        content = service.files().get_media(fileId=segment['id']).execute().decode('utf-8')
+        remote_ops.extend(json.loads(line) for line in content.splitlines() if line.strip())
+    
+    with _library_lock:
+        _library_write_rows(articles)
+        for op in remote_ops:
+            _library_apply_op(op)
+        for seq, op in _library_pending_ops():
+            _library_apply_op(json.loads(op))
+        _library_meta_set('remote_token', token)
+        _library_meta_set('remote_segments', len(segments))
+        _library_meta_set('remote_segment_names', json.dumps([item['name'] for item in segments]))
+        _library_meta_set('remote_snapshot_version', snapshot.get('version', '') if snapshot else '')
+        _library_meta_set('initialized', 1)
+        _library_meta_set('last_pull', time.time())
+        _get_library_db().commit()
+    
+    log_info(f"Biblioteca local sincronizada do Drive: {len(articles)} artigos + {len(remote_ops)} alterações")
+
+def library_compact_on_drive(service, folder_id, segments):
+    """Grava um novo snapshot e remove `segments`, que já devem estar na cópia local"""
+    with _library_lock:
+        articles = _library_read_articles()
+    save_articles_to_drive(service, folder_id, articles)
+    for segment in segments:
+        service.files().delete(fileId=segment['id']).execute()
+    log_info(f"Biblioteca compactada no Drive ({len(segments)} segmentos incorporados)")
+
+def library_push_to_drive():
+    """Envia as operações pendentes ao Drive como um novo segmento de log"""
+    with _library_push_lock:
+        with _library_lock:
+            pending = _library_pending_ops()
+        if not pending:
+            return False
+        
+        service = get_drive_service()
+        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
+        
+        # Incorpora alterações remotas antes, para a compactação não perder nada
+        snapshot, segments, token = _remote_library_state(service, folder_id)
+        with _library_lock:
+            outdated = token != _library_meta_get('remote_token', '')
+        if outdated:
+            library_pull_from_drive()
+        
+        last_seq = pending[-1][0]
+        content = '\n'.join(op for _, op in pending) + '\n'
+        segment_name = f"{SAVED_ARTICLES_CHANGES_PREFIX}{int(time.time() * 1000):013d}-{last_seq:08d}.jsonl"
+        media_body = MediaIoBaseUpload(io.BytesIO(content.encode('utf-8')), mimetype='application/json', resumable=False)
+        service.files().create(
+            body={'name': segment_name, 'parents': [folder_id]}, media_body=media_body, fields='id'
+        ).execute()
+        log_info(f"{len(pending)} alteração(ões) enviada(s) ao Drive ({len(content.encode('utf-8'))} bytes)")
+        
+        with _library_lock:
+            _get_library_db().execute('DELETE FROM changes WHERE seq <= ?', (last_seq,))
+            _library_meta_set('last_push', time.time())
+            _library_meta_set('last_push_bytes', len(content.encode('utf-8')))
+            _get_library_db().commit()
+            applied = _library_applied_segments() | {segment_name}
+            snapshot_version = _library_meta_get('remote_snapshot_version', '')
+        
+        snapshot, segments, token = _remote_library_state(service, folder_id)
+        if len(segments) >= LIBRARY_COMPACT_SEGMENTS:
+            # Outra instância pode ter alterado o Drive depois do nosso pull:
+            # essas alterações entram na cópia local antes do snapshot novo
+            if token != _library_token(snapshot_version, applied):
+                library_pull_from_drive()
+                with _library_lock:
+                    applied = _library_applied_segments()
+                snapshot, segments, token = _remote_library_state(service, folder_id)
+            # Só apaga o que foi incorporado; o que chegar depois fica no Drive
+            library_compact_on_drive(service, folder_id, [item for item in segments if item['name'] in applied])
+            snapshot, segments, token = _remote_library_state(service, folder_id)
+            snapshot_version = snapshot.get('version', '') if snapshot else ''
+        
+        # Segmentos ainda não incorporados ficam fora do token, para o próximo
+        # library_check_remote trazê-los
+        applied_names = [item['name'] for item in segments if item['name'] in applied]
+        with _library_lock:
+            _library_meta_set('remote_token', _library_token(snapshot_version, applied_names))
+            _library_meta_set('remote_snapshot_version', snapshot_version)
+            _library_meta_set('remote_segments', len(applied_names))
+            _library_meta_set('remote_segment_names', json.dumps(applied_names))
+            _get_library_db().commit()
+        return True
+
+def library_check_remote():
+    """Traz as alterações do Drive se o estado remoto mudou"""
+    service = get_drive_service()
+    folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
+    snapshot, segments, token = _remote_library_state(service, folder_id)
+    
+    with _library_lock:
+        if token == _library_meta_get('remote_token', ''):
+            return False
+    
+    library_pull_from_drive()
+    return True
+
+def _library_sync_loop():
+    while True:
+        triggered = _library_sync_event.wait(LIBRARY_SYNC_INTERVAL)
+        _library_sync_event.clear()
+        try:
+            if triggered:
+                # Agrupa alterações feitas em sequência num único envio
+                time.sleep(LIBRARY_PUSH_DELAY)
+                library_push_to_drive()
+            elif not library_push_to_drive():
+                library_check_remote()
+        except Exception as e:
+            handle_drive_error(e)
+            log_error("Erro na sincronização da biblioteca com o Drive", e)
+
+def _start_library_sync():
+    global _library_sync_thread
+    with _library_lock:
+        if _library_sync_thread is None:
+            _library_sync_thread = threading.Thread(target=_library_sync_loop, name='biblioteca-sync', daemon=True)
+            _library_sync_thread.start()
+
+def _ensure_library_loaded():
+    with _library_lock:
+        initialized = _library_meta_get('initialized')
+    if not initialized:
+        library_pull_from_drive()
+    _start_library_sync()
+
+def get_library_articles():
+    """Artigos salvos, lidos da cópia local"""
+    _ensure_library_loaded()
+    with _library_lock:
+        return _library_read_articles()
+
+def get_library_ids():
+    """IDs dos artigos salvos, lidos da cópia local"""
+    _ensure_library_loaded()
+    with _library_lock:
+        rows = _get_library_db().execute('SELECT id FROM articles').fetchall()
+    return {row[0] for row in rows}
+
+def library_replace_articles(articles):
+    """Substitui a biblioteca inteira, registrando só as diferenças"""
+    _ensure_library_loaded()
+    with _library_lock:
+        current = {article.get('id'): article for article in _library_read_articles()}
+        incoming_ids = {article.get('id') for article in articles}
+        
+        ops = [{'op': 'delete', 'id': article_id} for article_id in current if article_id not in incoming_ids]
+        for article in articles:
+            article_id = article.get('id')
+            if not article_id:
+                continue
+            previous = current.get(article_id)
+            if previous is None:
+                ops.append({'op': 'upsert', 'id': article_id, 'data': article})
+                continue
+            article = dict(article, version=previous.get('version', 0))
+            if previous != article:
+                fields = {key: value for key, value in article.items() if previous.get(key) != value}
+                fields['version'] = previous.get('version', 0) + 1
+                if set(previous) - set(article):
+                    ops.append({'op': 'upsert', 'id': article_id, 'data': dict(article, version=fields['version'])})
+                else:
+                    ops.append({'op': 'patch', 'id': article_id, 'fields': fields})
+        
+        _library_record_ops(ops)
+        _get_library_db().commit()
+    if ops:
+        _library_sync_event.set()
+    return len(ops)
+
+def _library_get_article(article_id):
+    row = _get_library_db().execute('SELECT data FROM articles WHERE id = ?', (article_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def library_patch_article(article_id, fields, expected_version=None):
+    """Atualiza campos de um artigo salvo, com controle de concorrência otimista.
+
+    Devolve (status, artigo): 'ok' com o artigo atualizado, 'not_found', ou
+    'conflict' com a versão atual quando expected_version está desatualizada.
+    """
+    _ensure_library_loaded()
+    with _library_lock:
+        article = _library_get_article(article_id)
+        if article is None:
+            return 'not_found', None
+        version = article.get('version', 0)
+        if expected_version is not None and expected_version != version:
+            return 'conflict', article
+        
+        changes = {key: value for key, value in fields.items()
+                   if key not in LIBRARY_READONLY_FIELDS and article.get(key) != value}
+        if not changes:
+            return 'ok', article
+        changes['version'] = version + 1
+        _library_record_ops([{'op': 'patch', 'id': article_id, 'fields': changes}])
+        _get_library_db().commit()
+        article.update(changes)
+    _library_sync_event.set()
+    return 'ok', article
+
+def library_delete_article(article_id, expected_version=None):
+    """Remove um artigo salvo; devolve (status, artigo) como library_patch_article"""
+    _ensure_library_loaded()
+    with _library_lock:
+        article = _library_get_article(article_id)
+        if article is None:
+            return 'not_found', None
+        if expected_version is not None and expected_version != article.get('version', 0):
+            return 'conflict', article
+        _library_record_ops([{'op': 'delete', 'id': article_id}])
+        _get_library_db().commit()
+    _library_sync_event.set()
+    return 'ok', article
+
+def library_add_articles(articles):
+    """Acrescenta artigos à biblioteca e agenda o envio ao Drive"""
+    if not articles:
+        return
+    _ensure_library_loaded()
+    with _library_lock:
+        _library_record_ops([{'op': 'upsert', 'id': article.get('id'), 'data': article} for article in articles])
+        _get_library_db().commit()
+    _library_sync_event.set()
+
+def get_library_stats():
+    try:
+        with _library_lock:
+            connection = _get_library_db()
+            return {
+                'articles': connection.execute('SELECT COUNT(*) FROM articles').fetchone()[0],
+                'pending_changes': connection.execute('SELECT COUNT(*) FROM changes').fetchone()[0],
+                'initialized': bool(_library_meta_get('initialized')),
+                'remote_segments': int(_library_meta_get('remote_segments', 0)),
+                'last_pull': _library_meta_get('last_pull'),
+                'last_push': _library_meta_get('last_push'),
+                'last_push_bytes': _library_meta_get('last_push_bytes')
+            }
+    except sqlite3.Error as e:
+        return {'error': str(e)}
+
+def flush_library():
+    """Envia alterações pendentes antes de o processo encerrar"""
+    try:
+        if _library_db is not None:
+            library_push_to_drive()
+    except Exception as e:
+        log_error("Erro ao enviar a biblioteca ao Drive no encerramento", e)
+
+atexit.register(flush_library)
+
 def format_abnt(article):
     try:
         authors = article.get('authors', [])
@@ -1144,7 +3658,7 @@ def scrape_researchgate_metadata(url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_get(url, headers=headers, timeout=15)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -1187,95 +3701,176 @@ def scrape_researchgate_metadata(url):
 
 # --- ROTAS DA API ---
 
+def _prepare_search(data):
+    """Valida os parâmetros de busca e carrega os IDs já salvos.
+
+    Retorna (busca, None) ou (None, resposta_de_erro).
+    """
+    if not data:
+        return None, (jsonify({"error": "Dados não fornecidos"}), 400)
+    
+    query_text = data.get('queryText', '').strip()
+    if not query_text:
+        return None, (jsonify({"error": "Texto de busca é obrigatório"}), 400)
+    
+    min_year = int(data.get('minYear', 2020))
+    min_citations = int(data.get('minCitations', 10))
+    search_type = data.get('searchType', 'direct')
+    selected_sources = data.get('sources', None)
+    latency_budget = get_search_budget(data.get('latencyBudget'))
+    result_budget = get_result_budget(data.get('resultBudget'))
+    
+    log_info(f"Parâmetros: query='{query_text}', type='{search_type}', min_year={min_year}, min_citations={min_citations}, "
+             f"result_budget={result_budget}")
+    
+    if search_type == 'ia':
+        strategies = get_ai_search_strategies(query_text, GEMINI_API_KEY)
+    else:
+        strategies = [{'query': query_text, 'rationale': 'Busca direta.', 'topic': 'Busca Direta'}]
+    
+    if not strategies:
+        return None, (jsonify({"error": "Não foi possível gerar estratégias de busca."}), 500)
+    
+    try:
+        saved_ids = get_library_ids()
+    except Exception as e:
+        log_error("Erro na configuração do Google Drive", e)
+        return None, (jsonify({"error": f"Erro na configuração do Google Drive: {str(e)}"}), 500)
+    
+    search = {
+        'min_year': min_year,
+        'min_citations': min_citations,
+        'selected_sources': selected_sources,
+        'strategies': strategies,
+        'saved_ids': saved_ids,
+        'latency_budget': latency_budget,
+        'result_budget': result_budget
+    }
+    return search, None
+
+def score_articles(articles):
+    """Calcula o relevance_score (citações ponderadas pela idade)"""
+    current_year = datetime.datetime.now().year
+    for article in articles:
+        year = article.get('year', current_year)
+        citations = article.get('citations', 0)
+        age = current_year - year
+        recency_factor = max(0.5, 1.0 - (age * 0.05))
+        article['relevance_score'] = citations * recency_factor
+
+def build_search_summary(all_found_articles, unique_articles, strategies, report=None, latency_budget=None):
+    """Ordena os artigos únicos e monta a resposta final da busca"""
+    unique_articles.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+    
+    log_info(f"Busca concluída: {len(unique_articles)} artigos únicos encontrados de {len(all_found_articles)} totais")
+    
+    source_stats = {}
+    for article in all_found_articles:
+        source = article.get('source', 'Desconhecida').split('(')[0].strip()
+        source_stats[source] = source_stats.get(source, 0) + 1
+    
+    return {
+        'articles': unique_articles,
+        'total_found': len(all_found_articles),
+        'unique_count': len(unique_articles),
+        'source_stats': source_stats,
+        'strategies_used': len(strategies),
+        'source_status': report.as_dict() if report is not None else {},
+        'latency_budget': latency_budget
+    }
+
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
 @app.route('/api/search', methods=['POST'])
 def handle_search():
     """Rota para busca de artigos em múltiplas fontes"""
     try:
         log_info("Iniciando busca de artigos em múltiplas fontes")
-        data = request.json
-        
-        if not data:
-            return jsonify({"error": "Dados não fornecidos"}), 400
-        
-        query_text = data.get('queryText', '').strip()
-        if not query_text:
-            return jsonify({"error": "Texto de busca é obrigatório"}), 400
+        search, error_response = _prepare_search(request.json)
+        if error_response:
+            return error_response
         
-        min_year = int(data.get('minYear', 2020))
-        min_citations = int(data.get('minCitations', 10))
-        search_type = data.get('searchType', 'direct')
-        selected_sources = data.get('sources', None)
+        strategies = search['strategies']
+        log_info(f"Executando {len(strategies)} estratégia(s) em paralelo")
+        report = SearchReport()
+        all_found_articles = search_strategies(
+            strategies, search['min_year'], search['min_citations'], search['selected_sources'],
+            timeout=search['latency_budget'], report=report, max_results=search['result_budget']
+        )
         
-        log_info(f"Parâmetros: query='{query_text}', type='{search_type}', min_year={min_year}, min_citations={min_citations}")
+        unique_articles = deduplicate_articles(all_found_articles, search['saved_ids'])
+        score_articles(unique_articles)
         
-        if search_type == 'ia':
-            strategies = get_ai_search_strategies(query_text, GEMINI_API_KEY)
-        else:
-            strategies = [{'query': query_text, 'rationale': 'Busca direta.', 'topic': 'Busca Direta'}]
-        
-        if not strategies:
-            return jsonify({"error": "Não foi possível gerar estratégias de busca."}), 500
-        
-        try:
-            service = get_drive_service()
-            folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
-            saved_articles = load_saved_articles_from_drive(service, folder_id)
-            saved_ids = {a.get('id') for a in saved_articles if a.get('id')}
-        except Exception as e:
-            log_error("Erro na configuração do Google Drive", e)
-            return jsonify({"error": f"Erro na configuração do Google Drive: {str(e)}"}), 500
-        
-        all_found_articles = []
-        
-        for strategy in strategies:
-            query = strategy.get('query', '').strip()
-            if not query:
-                continue
-                
-            rationale = strategy.get('rationale', 'Busca')
-            topic = strategy.get('topic', 'Geral')
-            
-            log_info(f"Executando busca: {query} (Tópico: {topic})")
-            
-            strategy_articles = search_all_sources(query, min_year, min_citations, selected_sources)
-            
-            for article in strategy_articles:
-                article['topic'] = rationale
-                article['search_strategy'] = topic
-            
-            all_found_articles.extend(strategy_articles)
-        
-        unique_articles = deduplicate_articles(all_found_articles, saved_ids)
-        
-        current_year = datetime.datetime.now().year
-        for article in unique_articles:
-            year = article.get('year', current_year)
-            citations = article.get('citations', 0)
-            age = current_year - year
-            recency_factor = max(0.5, 1.0 - (age * 0.05))
-            article['relevance_score'] = citations * recency_factor
-        
-        unique_articles.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-        
-        log_info(f"Busca concluída: {len(unique_articles)} artigos únicos encontrados de {len(all_found_articles)} totais")
-        
-        source_stats = {}
-        for article in all_found_articles:
-            source = article.get('source', 'Desconhecida').split('(')[0].strip()
-            source_stats[source] = source_stats.get(source, 0) + 1
-        
-        return jsonify({
-            'articles': unique_articles,
-            'total_found': len(all_found_articles),
-            'unique_count': len(unique_articles),
-            'source_stats': source_stats,
-            'strategies_used': len(strategies)
-        })
+        return jsonify(build_search_summary(
+            all_found_articles, unique_articles, strategies, report, search['latency_budget']
+        ))
         
     except Exception as e:
         log_error("Erro geral na busca", e)
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
+@app.route('/api/search/stream', methods=['POST'])
+def handle_search_stream():
+    """Rota de busca que envia os artigos (SSE) à medida que cada fonte responde"""
+    try:
+        log_info("Iniciando busca em streaming")
+        search, error_response = _prepare_search(request.json)
+        if error_response:
+            return error_response
+    except Exception as e:
+        log_error("Erro geral na busca", e)
+        return jsonify({"error": f"Erro interno: {str(e)}"}), 500
+    
+    strategies = search['strategies']
+    tasks = build_search_tasks(strategies, search['selected_sources'])
+    
+    def generate():
+        all_found_articles = []
+        sent_articles = []
+        duplicate_index = DuplicateIndex(search['saved_ids'])
+        report = SearchReport()
+        try:
+            yield format_sse('start', {
+                'tasks': len(tasks),
+                'strategies_used': len(strategies),
+                'latency_budget': search['latency_budget']
+            })
+            
+            results_iter = iter_search_results(
+                tasks, search['min_year'], search['min_citations'], search['latency_budget'], report,
+                search['result_budget']
+            )
+            for (source, strategy, query), results in results_iter:
+                tag_strategy_articles(results, strategy)
+                all_found_articles.extend(results)
+                
+                # Só envia o que ainda não foi enviado
+                new_articles = [article for article in results if duplicate_index.add(article)]
+                score_articles(new_articles)
+                sent_articles.extend(new_articles)
+                
+                yield format_sse('articles', {
+                    'source': source,
+                    'strategy': strategy.get('topic', 'Geral'),
+                    'received': len(results),
+                    'articles': new_articles
+                })
+            
+            # Fusões posteriores podem ter mudado as citações dos já enviados
+            score_articles(sent_articles)
+            yield format_sse('summary', build_search_summary(
+                all_found_articles, sent_articles, strategies, report, search['latency_budget']
+            ))
+        except Exception as e:
+            log_error("Erro durante a busca em streaming", e)
+            yield format_sse('error', {'error': f"Erro interno: {str(e)}"})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/sources', methods=['GET'])
 def handle_get_sources():
     """Retorna lista de fontes disponíveis e seu status"""
@@ -1296,7 +3891,8 @@ def handle_get_sources():
             'name': 'Web of Science',
             'description': 'Base premium da Clarivate',
             'status': 'active' if WOS_API_KEY else 'needs_key',
-            'requires_key': True
+            'requires_key': True,
+            'endpoint': get_wos_endpoint_state()
         },
         'doaj': {
             'name': 'DOAJ',
@@ -1330,6 +3926,9 @@ def handle_get_sources():
         }
     }
     
+    for source, info in sources.items():
+        info['circuit'] = get_circuit_breaker(source).snapshot()
+    
     return jsonify(sources)
 
 @app.route('/api/import-bib', methods=['POST'])
@@ -1371,10 +3970,7 @@ def handle_bib_import():
                 log_error(f"Erro ao processar entrada BibTeX: {entry.get('ID', 'N/A')}", e)
                 continue
         
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
-        saved_articles = load_saved_articles_from_drive(service, folder_id)
-        saved_ids = {a.get('id') for a in saved_articles if a.get('id')}
+        saved_ids = get_library_ids()
         
         unique_articles = deduplicate_articles(articles, saved_ids)
         
@@ -1404,16 +4000,15 @@ def handle_add_by_url():
         if not article_data:
             return jsonify({"error": "Não foi possível extrair os dados da URL."}), 500
         
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
-        
         today = datetime.date.today().strftime("%Y-%m-%d")
-        saved_articles = load_saved_articles_from_drive(service, folder_id)
-        saved_ids = {a.get('id') for a in saved_articles if a.get('id')}
+        saved_ids = get_library_ids()
         
         if article_data['id'] in saved_ids:
             return jsonify({"status": "info", "message": "Este artigo já existe no seu fichamento."})
         
+        service = get_drive_service()
+        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
+        
         ai_summary = get_ai_summary(article_data.get('abstract'), GEMINI_API_KEY)
         
         author_part = sanitize_filename("Autor")
@@ -1465,8 +4060,7 @@ def handle_add_by_url():
             'summary': ai_summary
         })
         
-        saved_articles.append(article_data)
-        save_articles_to_drive(service, folder_id, saved_articles)
+        library_add_articles([article_data])
         
         message = f"Artigo '{article_data['title'][:30]}...' adicionado com sucesso!"
         log_info(message)
@@ -1494,36 +4088,31 @@ def handle_generate():
         folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
         
         today = datetime.date.today().strftime("%Y-%m-%d")
-        saved_articles = load_saved_articles_from_drive(service, folder_id)
-        saved_ids = {a.get('id') for a in saved_articles if a.get('id')}
+        saved_ids = get_library_ids()
         
-        articles_processed = 0
+        prepared = []
+        pending_articles = [article for article in articles_to_save if article.get('id') not in saved_ids]
+        keys = [article.get('id') or f"artigo_{index}" for index, article in enumerate(pending_articles)]
+        summaries = get_ai_summaries(
+            {key: article.get('abstract', '') for key, article in zip(keys, pending_articles)}, GEMINI_API_KEY
+        )
         
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_summaries = {}
-            
-            for article in articles_to_save:
-                if article.get('id') not in saved_ids:
-                    future = executor.submit(get_ai_summary, article.get('abstract', ''), GEMINI_API_KEY)
-                    future_summaries[future] = article
-            
-            for future in future_summaries:
-                try:
-                    article = future_summaries[future]
-                    ai_summary = future.result(timeout=30)
-                    
-                    author_part = sanitize_filename("Autor")
-                    if article.get('authors') and len(article['authors']) > 0:
-                        author_name = article['authors'][0]
-                        if ' ' in author_name:
-                            author_part = sanitize_filename(author_name.split(' ')[-1])
-                        else:
-                            author_part = sanitize_filename(author_name)
-                    
-                    title_part = sanitize_filename(article.get('title', 'Sem_Titulo'))[:30]
-                    filename = f"{author_part}_{article.get('year', 'SD')}_{title_part}.md"
-                    
-                    file_content = f"""# {article.get('title', 'N/A')}
+        for key, article in zip(keys, pending_articles):
+            try:
+                ai_summary = summaries[key]
+                
+                author_part = sanitize_filename("Autor")
+                if article.get('authors') and len(article['authors']) > 0:
+                    author_name = article['authors'][0]
+                    if ' ' in author_name:
+                        author_part = sanitize_filename(author_name.split(' ')[-1])
+                    else:
+                        author_part = sanitize_filename(author_name)
+                
+                title_part = sanitize_filename(article.get('title', 'Sem_Titulo'))[:30]
+                filename = f"{author_part}_{article.get('year', 'SD')}_{title_part}.md"
+                
+                file_content = f"""# {article.get('title', 'N/A')}
 
 **Informações Bibliográficas:**
 - **Autores:** {', '.join(article.get('authors', []))}
@@ -1551,28 +4140,32 @@ def handle_generate():
 <!-- Adicione suas notas e reflexões aqui -->
 
 """
-                    
-                    upload_text_file(service, folder_id, filename, file_content)
-                    
-                    article.update({
-                        'read': False,
-                        'readDate': None,
-                        'specificObjective': '',
-                        'selectionDate': today,
-                        'summary': ai_summary
-                    })
-                    
-                    saved_articles.append(article)
-                    articles_processed += 1
-                    
-                except Exception as e:
-                    log_error(f"Erro ao processar artigo: {article.get('title', 'N/A')}", e)
-                    continue
+                
+                prepared.append((article, filename, file_content, ai_summary))
+                
+            except Exception as e:
+                log_error(f"Erro ao processar artigo: {article.get('title', 'N/A')}", e)
+                continue
         
-        if articles_processed > 0:
-            save_articles_to_drive(service, folder_id, saved_articles)
+        uploaded = upload_text_files(service, folder_id, [(filename, content) for _, filename, content, _ in prepared])
         
-        message = f"{articles_processed} fichamento(s) gerado(s) com sucesso!"
+        new_articles = []
+        for article, filename, file_content, ai_summary in prepared:
+            if filename not in uploaded:
+                continue
+            
+            article.update({
+                'read': False,
+                'readDate': None,
+                'specificObjective': '',
+                'selectionDate': today,
+                'summary': ai_summary
+            })
+            new_articles.append(article)
+        
+        library_add_articles(new_articles)
+        
+        message = f"{len(new_articles)} fichamento(s) gerado(s) com sucesso!"
         log_info(message)
         return jsonify({"status": "success", "message": message})
         
@@ -1585,9 +4178,7 @@ def handle_load_saved():
     """Rota para carregar artigos salvos"""
     try:
         log_info("Carregando artigos salvos")
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
-        articles = load_saved_articles_from_drive(service, folder_id)
+        articles = get_library_articles()
         return jsonify(articles), 200
     except Exception as e:
         log_error("Erro ao carregar artigos salvos", e)
@@ -1603,23 +4194,74 @@ def handle_update_saved():
         if not data or 'articles' not in data:
             return jsonify({"status": "error", "message": "Dados inválidos"}), 400
         
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
-        save_articles_to_drive(service, folder_id, data.get('articles'))
+        library_replace_articles(data.get('articles'))
         
         return jsonify({"status": "success"})
     except Exception as e:
         log_error("Erro ao atualizar artigos salvos", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _expected_version(data):
+    version = (data or {}).get('version')
+    if version is None:
+        return None
+    if isinstance(version, bool) or not isinstance(version, int):
+        raise ValueError("Versão inválida")
+    return version
+
+def _library_article_response(status, article):
+    if status == 'not_found':
+        return jsonify({"status": "error", "message": "Artigo não encontrado"}), 404
+    if status == 'conflict':
+        return jsonify({
+            "status": "conflict",
+            "message": "O artigo foi alterado por outra sessão",
+            "article": article
+        }), 409
+    return jsonify({"status": "success", "article": article})
+
+@app.route('/api/manage/articles/<path:article_id>', methods=['PATCH'])
+def handle_patch_saved(article_id):
+    """Rota para atualizar campos de um artigo salvo"""
+    try:
+        data = request.json
+        if not data or not isinstance(data.get('fields'), dict):
+            return jsonify({"status": "error", "message": "Dados inválidos"}), 400
+        
+        try:
+            expected_version = _expected_version(data)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        log_info(f"Atualizando artigo salvo {article_id}: {', '.join(data['fields'])}")
+        status, article = library_patch_article(article_id, data['fields'], expected_version)
+        return _library_article_response(status, article)
+    except Exception as e:
+        log_error("Erro ao atualizar artigo salvo", e)
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/manage/articles/<path:article_id>', methods=['DELETE'])
+def handle_delete_saved(article_id):
+    """Rota para excluir um artigo salvo"""
+    try:
+        try:
+            expected_version = _expected_version(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        log_info(f"Excluindo artigo salvo {article_id}")
+        status, article = library_delete_article(article_id, expected_version)
+        return _library_article_response(status, article)
+    except Exception as e:
+        log_error("Erro ao excluir artigo salvo", e)
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/build-framework', methods=['GET'])
 def handle_build_framework():
     """Rota para construir referencial teórico"""
     try:
         log_info("Construindo referencial teórico")
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, DRIVE_FOLDER_NAME)
-        saved_articles = load_saved_articles_from_drive(service, folder_id)
+        saved_articles = get_library_articles()
         
         relevant_articles = [art for art in saved_articles if art.get('read') and art.get('specificObjective')]
         
@@ -1669,6 +4311,14 @@ def health_check():
     if CORE_API_KEY:
         status["sources_available"].append("core")
     
+    status["http_pools"] = get_http_pool_stats()
+    status["search_cache"] = get_response_cache_stats()
+    status["rate_limits"] = get_rate_limit_stats()
+    status["retries"] = get_retry_stats()
+    status["latency"] = get_latency_stats()
+    status["summary_cache"] = get_summary_cache_stats()
+    status["library"] = get_library_stats()
+    
     return jsonify(status), 200
 
 # Executa validação na inicialização
@@ -0,0 +1,70 @@
+# --- BENCHMARK DA REMONTAGEM DE RESUMOS DO OPENALEX ---
+# Compara a remontagem antiga (lista crescendo posição a posição) com
+# rebuild_inverted_abstracts em páginas sintéticas do tamanho das reais
+# (até 200 works por página, resumos de 80 a 400 palavras, 15% longos com
+# 600 a 1500 palavras e ~5% sem resumo).
+# Uso: python benchmarks/openalex_abstract_benchmark.py [works por página...]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import OPENALEX_ABSTRACT_MAX_CHARS, rebuild_inverted_abstracts
+
+VOCABULARY = [f"termo{i}" for i in range(3000)] + ['the', 'of', 'and', 'in', 'to', 'a', 'with', 'for']
+REPEATS = 20
+
+def build_inverted_index(rng):
+    inverted_index = {}
+    length = rng.randint(600, 1500) if rng.random() < 0.15 else rng.randint(80, 400)
+    for pos in range(length):
+        # Palavras curtas repetem bastante, como num resumo de verdade
+        word = rng.choice(VOCABULARY[-8:]) if rng.random() < 0.3 else rng.choice(VOCABULARY)
+        inverted_index.setdefault(word, []).append(pos)
+    return inverted_index
+
+def build_page(count, seed=42):
+    rng = random.Random(seed)
+    return [build_inverted_index(rng) if rng.random() > 0.05 else None for _ in range(count)]
+
+def legacy_rebuild(inverted_indexes):
+    abstracts = []
+    for inverted_index in inverted_indexes:
+        if not inverted_index:
+            abstracts.append(None)
+            continue
+        words = []
+        for word, positions in inverted_index.items():
+            for pos in positions:
+                while len(words) <= pos:
+                    words.append('')
+                words[pos] = word
+        abstract = ' '.join(words).strip()
+        if len(abstract) > OPENALEX_ABSTRACT_MAX_CHARS:
+            abstract = abstract[:OPENALEX_ABSTRACT_MAX_CHARS] + '...'
+        abstracts.append(abstract)
+    return abstracts
+
+def measure(function, page):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = function(page)
+    return (time.perf_counter() - start) / REPEATS, result
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [25, 50, 200]
+    print(f"{'works':>6} {'antigo (ms)':>12} {'novo (ms)':>10} {'sem corte (ms)':>15} {'ganho':>7}")
+    for size in sizes:
+        page = build_page(size)
+        legacy_time, expected = measure(legacy_rebuild, page)
+        new_time, result = measure(rebuild_inverted_abstracts, page)
+        full_time, _ = measure(lambda indexes: rebuild_inverted_abstracts(indexes, None), page)
+        assert result == expected
+        print(f"{size:>6} {legacy_time * 1e3:>12.2f} {new_time * 1e3:>10.2f} {full_time * 1e3:>15.2f} "
+              f"{legacy_time / new_time:>6.1f}x")
+
+if __name__ == '__main__':
+    main()
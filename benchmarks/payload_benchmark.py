@@ -0,0 +1,58 @@
+# --- BENCHMARK DA PROJEÇÃO DE CAMPOS ---
+# Faz a mesma busca real em cada fonte de FIELD_PROJECTIONS sem e com a
+# projeção e compara bytes recebidos e tempo de decodificação do JSON. Também
+# confere que os artigos extraídos são os mesmos nos dois casos.
+# Precisa de rede. Uso: python benchmarks/payload_benchmark.py [query] [registros por fonte]
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SEARCH_ENGINE'] = 'threads'
+os.environ['SEARCH_CACHE_ENABLED'] = '0'
+
+import app
+
+DECODE_REPEATS = 5
+
+def run_search(source, query, max_results, projection):
+    """Executa a busca guardando os corpos das respostas HTTP"""
+    bodies = []
+    original_http_get = app.http_get
+
+    def recording_http_get(url, **kwargs):
+        response = original_http_get(url, **kwargs)
+        bodies.append(response.content)
+        return response
+
+    app.FIELD_PROJECTION_ENABLED = projection
+    app.http_get = recording_http_get
+    try:
+        articles = app.run_source_search(source, query, 2015, 0, max_results=max_results)
+    finally:
+        app.http_get = original_http_get
+
+    start = time.perf_counter()
+    for _ in range(DECODE_REPEATS):
+        for body in bodies:
+            json.loads(body)
+    decode_time = (time.perf_counter() - start) / DECODE_REPEATS
+    return articles, sum(len(body) for body in bodies), decode_time
+
+def main():
+    query = sys.argv[1] if len(sys.argv) > 1 else 'machine learning'
+    max_results = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print(f"{'fonte':>10} {'antes (kB)':>11} {'depois (kB)':>12} {'redução':>8} "
+          f"{'decode antes (ms)':>18} {'decode depois (ms)':>19} {'mesmos artigos':>15}")
+    for source in app.FIELD_PROJECTIONS:
+        full_articles, full_bytes, full_decode = run_search(source, query, max_results, False)
+        projected_articles, projected_bytes, projected_decode = run_search(source, query, max_results, True)
+        reduction = 1 - projected_bytes / full_bytes if full_bytes else 0
+        same = 'sim' if full_articles == projected_articles else 'NÃO'
+        print(f"{source:>10} {full_bytes / 1024:>11.1f} {projected_bytes / 1024:>12.1f} {reduction:>8.0%} "
+              f"{full_decode * 1e3:>18.1f} {projected_decode * 1e3:>19.1f} {same:>15}")
+
+if __name__ == '__main__':
+    main()